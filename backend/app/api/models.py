@@ -31,15 +31,37 @@ class UploadResponse(BaseModel):
     success: bool
     pdf_name: str
     message: str
+    job_id: Optional[str] = None  # poll /jobs/{job_id} until completed
+    document_id: Optional[str] = None
 
 
 class AudioVideoUploadResponse(BaseModel):
     success: bool
     filename: str
-    transcription: str
-    language: str
-    file_type: str  # "audio" or "video"
+    transcription: Optional[str] = None  # in the job result once transcribed
+    language: Optional[str] = None
+    file_type: Optional[str] = None  # "audio" or "video"
     message: str
+    job_id: Optional[str] = None
+    document_id: Optional[str] = None
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    session_id: str
+    document_id: str
+    document_name: str
+    document_type: str
+    status: str  # queued, running, completed, failed
+    stage: Optional[str] = None  # queued, parsing, transcribing, embedding, indexing, completed
+    pages_parsed: int
+    chunks_created: int
+    chunks_embedded: int
+    chunks_indexed: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
 
 
 class LegalAnalysisResponse(BaseModel):
@@ -1,27 +1,42 @@
+import asyncio
+import json
 from fastapi import APIRouter, UploadFile, File, HTTPException, Body
+from fastapi.responses import StreamingResponse
 from app.api.models import (
     ChatRequest, ChatResponse, QuestionRequest, QuestionResponse,
     UploadResponse, HistoryResponse, MessageHistory,
     LegalAnalysisResponse, AudioVideoUploadResponse,
-    TranslateRequest, TranslateResponse
+    TranslateRequest, TranslateResponse, IngestionJobResponse
 )
 from app.services.chat_service import chat_service
 from app.services.translation_service import translation_service
+from app.services.faiss_store import faiss_store
+from app.services.content_store import content_store
+from app.services.index_gc import index_gc
+from app.services.ingestion_jobs import ingestion_jobs, TERMINAL_STATUSES
+from app.services.ingestion_pipeline import save_upload
+from app.services.reranker import reranker
 from app.db.database import get_db
 from datetime import datetime
 
 router = APIRouter()
 
+# Fixed retrieval probe for entity extraction; its vector is pinned in the query cache
+EXTRACT_ENTITIES_QUERY = "FIR sections IPC CrPC BNS charges offense crime complainant accused witness"
+faiss_store.pin_query(EXTRACT_ENTITIES_QUERY)
+
+JOB_EVENTS_POLL_SECONDS = 0.5
+
 
 @router.post("/upload-document", response_model=UploadResponse)
 async def upload_document(file: UploadFile = File(...), session_id: str = None, session_token: str = None):
     """
     Upload legal document (PDF)
+    Returns a job id right away; extraction, embedding and indexing run in the background
     """
     try:
         from app.auth.auth_service import auth_service
         import uuid
-        from datetime import datetime
         
         # Verify session
         session = auth_service.get_session(session_token)
@@ -38,24 +53,19 @@ async def upload_document(file: UploadFile = File(...), session_id: str = None,
         
         document_id = str(uuid.uuid4())
         print(f"\n[PDF UPLOAD] File: {file.filename}")
-        result = await chat_service.process_document(file, session_id, document_id)
-        print(f"[PDF UPLOAD] Chunks created: {result['chunks_created']}")
-        print(f"[PDF UPLOAD] Indexed and ready — document_id={document_id}\n")
-
-        # Save to database
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO session_documents (session_id, document_id, document_name, document_type, uploaded_at) VALUES (?, ?, ?, ?, ?)",
-                (session_id, document_id, file.filename, "pdf", datetime.now().isoformat())
-            )
-            conn.commit()
+        file_path, content_sha256 = await save_upload(file, suffix=".pdf")
+        job_id = ingestion_jobs.submit(session_id, document_id, file_path, file.filename, "pdf", content_sha256)
+        print(f"[PDF UPLOAD] Queued job {job_id} — document_id={document_id}\n")
 
         return UploadResponse(
             success=True,
-            pdf_name=result["doc_name"],
-            message=f"Document indexed successfully ({result['chunks_created']} chunks)"
+            pdf_name=file.filename,
+            message="Document queued for indexing",
+            job_id=job_id,
+            document_id=document_id
         )
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
@@ -67,38 +77,70 @@ async def upload_document(file: UploadFile = File(...), session_id: str = None,
 async def upload_audio_video(file: UploadFile = File(...), session_id: str = None):
     """
     Upload audio or video file for transcription
+    Returns a job id right away; transcription and indexing run in the background
     """
     try:
+        import os
         import uuid
-        from datetime import datetime
-        document_id = str(uuid.uuid4())
-        print(f"\n[AV UPLOAD] File: {file.filename}")
-        result = await chat_service.process_audio_video(file, session_id, document_id)
-        print(f"[AV UPLOAD] Type: {result['file_type']} | Language detected: {result['language']}")
-        print(f"[AV UPLOAD] Transcription ({len(result['transcription'])} chars):\n{result['transcription'][:500]}{'...' if len(result['transcription']) > 500 else ''}")
-        print(f"[AV UPLOAD] Indexed and ready — document_id={document_id}\n")
+        from app.services.speech_to_text import speech_to_text_service
+        if not speech_to_text_service.is_supported_file(file.filename):
+            raise HTTPException(status_code=400, detail=f"Unsupported file format: {file.filename}")
 
-        # Save to database
+        # Checked up front: a job for an unknown session would only fail once transcribed
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO session_documents (session_id, document_id, document_name, document_type, uploaded_at) VALUES (?, ?, ?, ?, ?)",
-                (session_id, document_id, file.filename, result["file_type"], datetime.now().isoformat())
-            )
-            conn.commit()
+            cursor.execute("SELECT 1 FROM chat_sessions WHERE session_id = ?", (session_id,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Session not found")
+
+        document_id = str(uuid.uuid4())
+        print(f"\n[AV UPLOAD] File: {file.filename}")
+        file_path, content_sha256 = await save_upload(file, suffix=os.path.splitext(file.filename)[1].lower())
+        job_id = ingestion_jobs.submit(session_id, document_id, file_path, file.filename, "media", content_sha256)
+        print(f"[AV UPLOAD] Queued job {job_id} — document_id={document_id}\n")
 
         return AudioVideoUploadResponse(
             success=True,
-            filename=result["doc_name"],
-            transcription=result["transcription"],
-            language=result["language"],
-            file_type=result["file_type"],
-            message="Audio/Video transcribed and indexed successfully"
+            filename=file.filename,
+            message="Audio/Video queued for transcription",
+            job_id=job_id,
+            document_id=document_id
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(job_id: str):
+    """Status and per-stage progress of an upload's ingestion job"""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def ingestion_job_events(job_id: str):
+    """Server-sent events: the job's state on every change, until it completes or fails"""
+    if ingestion_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            job = ingestion_jobs.get(job_id)
+            if job != last:
+                yield f"data: {json.dumps(job)}\n\n"
+                last = job
+            if job["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.post("/transcribe-audio")
 async def transcribe_audio(file: UploadFile = File(...), language: str = None):
     """
@@ -292,9 +334,9 @@ async def extract_entities(session_id: str, request: dict = Body(default=None)):
         processing_mode = "single_document" if document_ids and len(document_ids) == 1 else "multi_document"
         
         # Get document content
-        results = faiss_store.query(
+        results = await faiss_store.aquery(
             session_id=session_id,
-            query_text="FIR sections IPC CrPC BNS charges offense crime complainant accused witness",
+            query_text=EXTRACT_ENTITIES_QUERY,
             top_k=30,
             document_ids=document_ids
         )
@@ -423,12 +465,11 @@ async def delete_document(session_id: str, document_id: str):
             )
             conn.commit()
         
-        # Delete FAISS index
-        from app.services.faiss_store import faiss_store
+        # Delete FAISS index; on failure the index GC removes it later
         try:
-            faiss_store.delete_index(session_id, document_id)
-        except:
-            pass
+            await faiss_store.adelete_index(session_id, document_id)
+        except Exception as e:
+            print(f"[DELETE] Index deletion failed for {session_id}/{document_id}: {e}")
         
         return {"deleted": True, "document_id": document_id}
     except Exception as e:
@@ -589,20 +630,20 @@ async def delete_session(session_id: str, session_token: str):
             if not row or row["user_id"] != session["user_id"]:
                 raise HTTPException(status_code=403, detail="Access denied")
 
-            # Delete messages
+            # Delete messages and document records
             cursor.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            cursor.execute("DELETE FROM session_documents WHERE session_id = ?", (session_id,))
 
             # Delete session
             cursor.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
 
             conn.commit()
 
-        # Also delete FAISS index if exists
-        from app.services.faiss_store import faiss_store
+        # Also delete FAISS index if exists; on failure the index GC removes it later
         try:
-            faiss_store.delete_index(session_id)
-        except:
-            pass
+            await faiss_store.adelete_index(session_id)
+        except Exception as e:
+            print(f"[DELETE] Index deletion failed for session {session_id}: {e}")
 
         return {"deleted": True, "session_id": session_id}
     except Exception as e:
@@ -684,6 +725,33 @@ async def check_dependencies():
     return results
 
 
+@router.get("/debug/vector-store-stats")
+async def vector_store_stats():
+    """Residency, cache and executor queue counters (for sizing FAISS_MEMORY_BUDGET_MB and worker pools)"""
+    return {**faiss_store.stats(), "reranker": reranker.stats(), "content_store": content_store.stats()}
+
+
+@router.post("/debug/index-gc")
+async def run_index_gc():
+    """Reconcile indexes with session_documents now and report reclaimed bytes"""
+    return await index_gc.executor.run(index_gc.collect)
+
+
+@router.get("/debug/index-gc")
+async def index_gc_report():
+    """Report of the last index GC run"""
+    return {"last_report": index_gc.last_report}
+
+
+@router.get("/debug/index-report/{session_id}")
+async def index_report(session_id: str, k: int = 10, include_ivfpq: bool = False):
+    """Recall@k and latency of each FAISS index type on a session's vectors (IVF-PQ only on request)"""
+    report = await faiss_store.query_executor.run(
+        faiss_store.index_type_report, session_id, k, include_ivfpq=include_ivfpq
+    )
+    return {"session_id": session_id, "report": report}
+
+
 # Authentication endpoints
 @router.post("/register")
 async def register(username: str = Body(...), email: str = Body(...), password: str = Body(...)):
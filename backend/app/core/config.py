@@ -0,0 +1,78 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Directory holding the session indexes and the vector store's shared databases
+FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", "faiss_indexes")
+
+# Vector store residency: loaded session indexes are kept within this budget
+# and dropped after sitting idle for the TTL (they reload from disk on demand)
+FAISS_MEMORY_BUDGET_MB = int(os.getenv("FAISS_MEMORY_BUDGET_MB", "512"))
+FAISS_INDEX_TTL_SECONDS = int(os.getenv("FAISS_INDEX_TTL_SECONDS", "1800"))
+
+# Session index type: flat, fp16, sq8, ivf, ivfpq, or auto (chosen by chunk count);
+# uploads land flat and background compaction trains the chosen type. nprobe is
+# the number of IVF lists visited per search
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "auto")
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+
+# Uploads append a segment to the session index; this many segments trigger a
+# background compaction into the base index
+FAISS_MAX_SEGMENTS = int(os.getenv("FAISS_MAX_SEGMENTS", "8"))
+
+# Index garbage collection: reconciles indexes with session_documents every
+# interval (0 disables) and spares anything modified within the grace period
+INDEX_GC_INTERVAL_SECONDS = int(os.getenv("INDEX_GC_INTERVAL_SECONDS", "3600"))
+INDEX_GC_GRACE_SECONDS = int(os.getenv("INDEX_GC_GRACE_SECONDS", "600"))
+# Stored upload content no document refers to any more is purged by the
+# collection once it has not been used for this long (0 = on the next run)
+CONTENT_STORE_RETENTION_SECONDS = int(os.getenv("CONTENT_STORE_RETENTION_SECONDS", "86400"))
+
+# Embedding engine: "hf" (sentence-transformers on PyTorch, the reference),
+# "onnx" (ONNX Runtime, int8-quantized unless EMBEDDING_ONNX_QUANTIZE=false) or
+# "hashing" (deterministic NumPy feature hashing, no model; for CI and benchmarks)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hf")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = library default
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "onnx_models")
+EMBEDDING_HASH_DIM = int(os.getenv("EMBEDDING_HASH_DIM", "768"))
+
+# Vector store work runs off the event loop: searches and ingestion get
+# separate pools so a large upload cannot starve chat requests
+VECTOR_STORE_QUERY_WORKERS = int(os.getenv("VECTOR_STORE_QUERY_WORKERS", "4"))
+VECTOR_STORE_INGEST_WORKERS = int(os.getenv("VECTOR_STORE_INGEST_WORKERS", "1"))
+
+# Scanned PDF pages are OCR'd in this many worker processes (0 = CPU count)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))
+
+# PDF chunking: "flat" embeds overlapping ~900-char chunks; "hierarchical" embeds
+# non-overlapping child chunks and returns their parent page (split into sections
+# above PARENT_CHUNK_SIZE characters) as context
+CHUNKING_MODE = os.getenv("CHUNKING_MODE", "flat")
+CHILD_CHUNK_SIZE = int(os.getenv("CHILD_CHUNK_SIZE", "800"))
+PARENT_CHUNK_SIZE = int(os.getenv("PARENT_CHUNK_SIZE", "2000"))
+
+# Uploads are processed by background ingestion jobs in this many worker threads
+INGESTION_JOB_WORKERS = int(os.getenv("INGESTION_JOB_WORKERS", "1"))
+
+# Uploads stream page -> chunks -> embedding batch -> index append; chunks per batch
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+# Retrieval: "hybrid" fuses FAISS results with BM25 over an inverted index, "dense" is FAISS only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Optional cross-encoder rerank: RERANK_CANDIDATES chunks are retrieved, scored
+# against the query in one batch, and the best RERANK_TOP_K go into the prompt
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "3"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+
+# Models loaded in the background at startup (comma-separated: embeddings,
+# whisper, reranker; empty disables). The reranker is added when enabled
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "embeddings,whisper")
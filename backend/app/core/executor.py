@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class InstrumentedExecutor:
+    """
+    Fixed-size thread pool for running blocking work off the asyncio event loop
+    Tracks queue depth, running tasks and queue wait time
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self._total_wait_seconds = 0.0
+
+    def _instrumented(self, fn: Callable, args, kwargs) -> Callable:
+        """fn wrapped to count it as queued now, then running, completed or failed"""
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        def task():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._total_wait_seconds += time.monotonic() - submitted_at
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+            return result
+
+        return task
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        task = self._instrumented(fn, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and block until its result, for callers outside the event loop"""
+        return self._executor.submit(self._instrumented(fn, args, kwargs)).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait_ms": (self._total_wait_seconds / self.completed * 1000) if self.completed else 0.0
+            }
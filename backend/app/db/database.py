@@ -53,16 +53,50 @@ def init_db():
         )
     """)
     
+    # Background upload processing; the session_documents row is written when a job completes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_jobs (
+            job_id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            document_id TEXT NOT NULL,
+            document_name TEXT NOT NULL,
+            document_type TEXT NOT NULL,
+            content_sha256 TEXT,
+            status TEXT NOT NULL,
+            stage TEXT,
+            pages_parsed INTEGER NOT NULL DEFAULT 0,
+            chunks_created INTEGER NOT NULL DEFAULT 0,
+            chunks_embedded INTEGER NOT NULL DEFAULT 0,
+            chunks_indexed INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Databases created before uploads were deduplicated
+    cursor.execute("PRAGMA table_info(ingestion_jobs)")
+    if "content_sha256" not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE ingestion_jobs ADD COLUMN content_sha256 TEXT")
+    
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_id ON chat_messages(session_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON chat_messages(timestamp)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_doc_session ON session_documents(session_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_session ON ingestion_jobs(session_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_content ON ingestion_jobs(content_sha256)")
     
     conn.commit()
     conn.close()
 
 @contextmanager
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
+    with connect(DB_PATH) as conn:
+        yield conn
+
+@contextmanager
+def connect(db_path: str):
+    conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
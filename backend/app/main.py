@@ -1,7 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import routes
 from app.db.database import init_db
+from app.services.index_gc import index_gc
+from app.services.ingestion_jobs import ingestion_jobs
+from app.services.model_warmup import model_warmup
 
 app = FastAPI(title="AI Law Bot API", version="2.0.0", description="Indian Legal RAG Assistant")
 
@@ -18,6 +22,14 @@ init_db()
 
 app.include_router(routes.router, prefix="/api")
 
+
+@app.on_event("startup")
+def start_background_jobs():
+    ingestion_jobs.recover()
+    model_warmup.start()
+    index_gc.start()
+
+
 @app.get("/")
 def root():
     return {
@@ -25,3 +37,10 @@ def root():
         "version": "2.0.0",
         "description": "Indian Legal RAG Assistant"
     }
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once model warm-up has finished (failures listed in the body), 503 before"""
+    status = model_warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
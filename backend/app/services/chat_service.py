@@ -1,6 +1,5 @@
 import os
 from typing import Dict, Any, List
-from fastapi import UploadFile
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
@@ -8,11 +7,15 @@ from dotenv import load_dotenv
 from app.services.faiss_store import faiss_store
 from app.services.document_processor import document_processor
 from app.services.translation_service import translation_service
-from app.services.speech_to_text import speech_to_text_service
 from app.services.legal_section_predictor import legal_predictor
+from app.services.reranker import reranker
 
 load_dotenv()
 
+# Fixed retrieval probe for document analysis; its vector is pinned in the query cache
+ANALYZE_DOCUMENT_QUERY = "legal sections, case details, charges, offense"
+faiss_store.pin_query(ANALYZE_DOCUMENT_QUERY)
+
 
 class ChatService:
     """
@@ -28,83 +31,21 @@ class ChatService:
             temperature=0.6
         )
 
-    async def process_document(self, file: UploadFile, session_id: str, document_id: str):
-        """
-        Process PDF/text document and create FAISS index
-
-        Args:
-            file: Uploaded document file
-            session_id: Unique session ID
-            document_id: Unique document ID
-
-        Returns:
-            Dict with document info
-        """
-        # Read file content
-        content = await file.read()
-
-        # Create file-like object
-        class UploadedFile:
-            def __init__(self, name, content):
-                self.name = name
-                self._content = content
-
-            def read(self):
-                return self._content
-
-        uploaded_doc = UploadedFile(file.filename, content)
-
-        # Process document
-        texts, metadata = document_processor.process_pdf(uploaded_doc)
-        chunks, metas = document_processor.chunk_documents(texts, metadata)
-
-        # Create FAISS index with document_id
-        faiss_store.create_index(chunks, metas, session_id, document_id)
-
-        return {"doc_name": file.filename, "chunks_created": len(chunks), "document_id": document_id}
-
-    async def process_audio_video(self, file: UploadFile, session_id: str, document_id: str):
-        """
-        Process audio/video file, extract text, and create FAISS index
-
-        Args:
-            file: Uploaded audio/video file
-            session_id: Session ID
-            document_id: Document ID
-
-        Returns:
-            Dict with transcription info
-        """
-        # Transcribe audio/video
-        result = await speech_to_text_service.process_file(file)
-
-        # Create document from transcript
-        doc_text = result["text"]
-
+    def transcript_chunks(self, result: Dict[str, Any], filename: str):
+        """Chunks and chunk metadata of a transcription"""
         # Chunk the transcript
-        chunks = document_processor.legal_aware_chunking(doc_text)
+        chunks = document_processor.legal_aware_chunking(result["text"])
 
         # Create metadata
         metadata = [
             {
-                "source": file.filename,
+                "source": filename,
                 "type": result["file_type"],
-                "language": result["language"],
-                "text": chunk
+                "language": result["language"]
             }
             for chunk in chunks
         ]
-
-        # Create FAISS index with document_id
-        faiss_store.create_index(chunks, metadata, session_id, document_id)
-
-        return {
-            "doc_name": file.filename,
-            "transcription": doc_text,
-            "language": result["language"],
-            "file_type": result["file_type"],
-            "document_id": document_id
-        }
+        return chunks, metadata
 
     async def generate_response(
         self,
@@ -162,12 +103,18 @@ Corrected query:""",
         # Retrieve relevant context from FAISS using the cleaned query
         context = ""
         if session_id in self.sessions or True:  # Always try to query
-            results = faiss_store.query(
+            results = await faiss_store.aquery(
                 session_id=session_id,
                 query_text=search_query,
-                top_k=5,
-                document_ids=None  # Query all documents
+                top_k=reranker.candidates if reranker.enabled else 5,
+                document_ids=None,  # Query all documents
+                expand_parents=not reranker.enabled
             )
+            if results and reranker.enabled:
+                # Wide candidate pool in, only the most relevant few into the prompt;
+                # the small chunks are scored, then expanded to their parents
+                results = await faiss_store.query_executor.run(reranker.rerank, search_query, results)
+                results = await faiss_store.query_executor.run(faiss_store.expand_parents, session_id, results)
             if results:
                 context = "\n\n".join([r["text"] for r in results])
 
@@ -346,9 +293,9 @@ Answer:""",
             Structured legal analysis
         """
         # Get document summary from FAISS
-        results = faiss_store.query(
+        results = await faiss_store.aquery(
             session_id=session_id,
-            query_text="legal sections, case details, charges, offense",
+            query_text=ANALYZE_DOCUMENT_QUERY,
             top_k=10,
             document_ids=document_ids
         )
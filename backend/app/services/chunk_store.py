@@ -0,0 +1,262 @@
+import json
+from typing import Dict, List
+
+from app.db.database import connect
+
+# Metadata keys stored in their own columns; anything else goes to the extra JSON column
+FIXED_METADATA_KEYS = ("source", "page", "ocr")
+
+SCHEMA_VERSION = 1
+
+
+class ChunkStore:
+    """
+    SQLite-backed docstore for one session index
+    Chunks are keyed by FAISS vector id and read lazily by id lookup, so
+    loading an index never deserializes the whole docstore. Each chunk's
+    text is stored once; source, page and OCR flag are fixed-width columns.
+    Parent passages (pages or sections) of hierarchically chunked documents
+    are stored alongside, referenced by the children's parent_id metadata.
+    Also holds the index manifest: base file, append-only segments and
+    tombstones of removed documents awaiting compaction
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            # Opening an existing index only reads the version, so loads never write or lock
+            if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+
+            # AUTOINCREMENT so a removed document's number (and vector id range) is not reused
+            # while this file exists; deleting the whole session starts numbering over, so
+            # vector ids are not stable keys across a session's lifetime
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    document_number INTEGER PRIMARY KEY AUTOINCREMENT,
+                    document_id TEXT NOT NULL UNIQUE
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    vector_id INTEGER PRIMARY KEY,
+                    document_number INTEGER NOT NULL,
+                    source_id INTEGER,
+                    page INTEGER,
+                    ocr INTEGER NOT NULL DEFAULT 0,
+                    text TEXT NOT NULL,
+                    extra TEXT
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks(document_number)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS index_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    segment_number INTEGER PRIMARY KEY,
+                    file_name TEXT NOT NULL
+                )
+            """)
+            # Page/section text that hierarchical children expand to; never embedded
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS parents (
+                    parent_id INTEGER PRIMARY KEY,
+                    document_number INTEGER NOT NULL,
+                    text TEXT NOT NULL
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_parents_document ON parents(document_number)")
+            # Vectors of removed documents stay in the index files until compaction
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tombstones (
+                    document_number INTEGER PRIMARY KEY,
+                    vector_count INTEGER NOT NULL
+                )
+            """)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+
+    def document_numbers(self) -> Dict[str, int]:
+        """document_id -> document number for every stored document"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT document_id, document_number FROM documents")
+            return {r["document_id"]: r["document_number"] for r in cursor.fetchall()}
+
+    def add_document(self, document_id: str) -> int:
+        """Allocate a new document number"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO documents (document_id) VALUES (?)", (document_id,))
+            conn.commit()
+            return cursor.lastrowid
+
+    def add_chunks(self, vector_ids: List[int], document_number: int, texts: List[str], metadatas: List[Dict]):
+        """Append chunks; only the new rows are written"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._insert_chunks(cursor, [
+                (vector_id, document_number, text, meta)
+                for vector_id, text, meta in zip(vector_ids, texts, metadatas)
+            ])
+            conn.commit()
+
+    def _insert_chunks(self, cursor, rows):
+        source_ids = {}
+        records = []
+        for vector_id, document_number, text, meta in rows:
+            extra = {k: v for k, v in meta.items() if k not in FIXED_METADATA_KEYS and k != "text"}
+            source = meta.get("source")
+            if source is not None and source not in source_ids:
+                cursor.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (source,))
+                cursor.execute("SELECT source_id FROM sources WHERE name = ?", (source,))
+                source_ids[source] = cursor.fetchone()[0]
+            records.append((
+                vector_id,
+                document_number,
+                source_ids.get(source),
+                meta.get("page"),
+                1 if meta.get("ocr") else 0,
+                text,
+                json.dumps(extra) if extra else None
+            ))
+        cursor.executemany(
+            "INSERT INTO chunks (vector_id, document_number, source_id, page, ocr, text, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            records
+        )
+
+    def add_parents(self, document_number: int, texts: List[str]) -> List[int]:
+        """Store a document's parent passages, returns their parent ids in order"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            parent_ids = []
+            for text in texts:
+                cursor.execute("INSERT INTO parents (document_number, text) VALUES (?, ?)", (document_number, text))
+                parent_ids.append(cursor.lastrowid)
+            conn.commit()
+            return parent_ids
+
+    def get_parents(self, parent_ids: List[int]) -> Dict[int, str]:
+        """Fetch parent passages by id -> text"""
+        if not parent_ids:
+            return {}
+        with connect(self.db_path) as conn:
+            placeholders = ",".join("?" * len(parent_ids))
+            rows = conn.execute(
+                f"SELECT parent_id, text FROM parents WHERE parent_id IN ({placeholders})",
+                list(parent_ids)
+            ).fetchall()
+            return {r["parent_id"]: r["text"] for r in rows}
+
+    def remove_document(self, document_id: str):
+        """Delete a document's chunks and tombstone its vectors"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT document_number FROM documents WHERE document_id = ?", (document_id,))
+            row = cursor.fetchone()
+            if not row:
+                return
+            doc_number = row["document_number"]
+            cursor.execute(
+                "INSERT OR REPLACE INTO tombstones (document_number, vector_count) SELECT ?, COUNT(*) FROM chunks WHERE document_number = ?",
+                (doc_number, doc_number)
+            )
+            cursor.execute("DELETE FROM chunks WHERE document_number = ?", (doc_number,))
+            cursor.execute("DELETE FROM parents WHERE document_number = ?", (doc_number,))
+            cursor.execute("DELETE FROM documents WHERE document_number = ?", (doc_number,))
+            conn.commit()
+
+    def base_file(self) -> str:
+        """File name of the compacted base index, None before the first compaction"""
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT value FROM index_state WHERE key = 'base_file'").fetchone()
+            return row["value"] if row else None
+
+    def segments(self) -> Dict[int, str]:
+        """segment number -> file name, in append order"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute("SELECT segment_number, file_name FROM segments ORDER BY segment_number").fetchall()
+            return {r["segment_number"]: r["file_name"] for r in rows}
+
+    def last_segment_number(self) -> int:
+        """Highest segment number ever allocated; numbers are not reused after compaction"""
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT value FROM index_state WHERE key = 'last_segment'").fetchone()
+            return int(row["value"]) if row else 0
+
+    def add_segment(self, segment_number: int, file_name: str):
+        with connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO segments (segment_number, file_name) VALUES (?, ?)",
+                (segment_number, file_name)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO index_state (key, value) VALUES ('last_segment', ?)",
+                (str(segment_number),)
+            )
+            conn.commit()
+
+    def tombstones(self) -> Dict[int, int]:
+        """document number -> vector count of removed documents awaiting compaction"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute("SELECT document_number, vector_count FROM tombstones").fetchall()
+            return {r["document_number"]: r["vector_count"] for r in rows}
+
+    def commit_compaction(self, base_file: str, segment_numbers: List[int], tombstones: List[int]):
+        """Atomically switch to a new base file that absorbed the given segments and tombstones"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT OR REPLACE INTO index_state (key, value) VALUES ('base_file', ?)", (base_file,))
+            cursor.executemany("DELETE FROM segments WHERE segment_number = ?", [(n,) for n in segment_numbers])
+            cursor.executemany("DELETE FROM tombstones WHERE document_number = ?", [(n,) for n in tombstones])
+            conn.commit()
+
+    def get(self, vector_ids: List[int]) -> Dict[int, Dict]:
+        """Fetch chunks by vector id -> {'text', 'metadata'}"""
+        if not vector_ids:
+            return {}
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(vector_ids))
+            cursor.execute(
+                f"""
+                SELECT c.vector_id, c.page, c.ocr, c.text, c.extra, s.name AS source
+                FROM chunks c LEFT JOIN sources s ON c.source_id = s.source_id
+                WHERE c.vector_id IN ({placeholders})
+                """,
+                list(vector_ids)
+            )
+            return {r["vector_id"]: {"text": r["text"], "metadata": self._metadata(r)} for r in cursor.fetchall()}
+
+    @staticmethod
+    def _metadata(row) -> Dict:
+        metadata = {}
+        if row["source"] is not None:
+            metadata["source"] = row["source"]
+        if row["page"] is not None:
+            metadata["page"] = row["page"]
+        if row["ocr"]:
+            metadata["ocr"] = True
+        if row["extra"]:
+            metadata.update(json.loads(row["extra"]))
+        return metadata
+
+    def chunk_count(self, document_number: int) -> int:
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM chunks WHERE document_number = ?", (document_number,))
+            return cursor.fetchone()[0]
@@ -0,0 +1,110 @@
+import re
+from typing import List
+
+from app.db.database import connect
+from app.services.document_processor import document_processor
+
+# "Section 420" / "Sec. 420" / "S. 420" without a named act
+BARE_SECTION_PATTERN = re.compile(r"\b(?:section|sec\.|s\.)\s*(\d+[A-Z]?)\b", re.IGNORECASE)
+
+ACTS = ("ipc", "crpc", "bns")
+
+SCHEMA_VERSION = 1
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"\s+", " ", value.replace(".", " ")).strip().lower()
+
+
+def extract_citations(text: str) -> List[str]:
+    """
+    Normalized citation keys mentioned in text, e.g. "ipc:420", "section:420",
+    "case:air 1973 sc 1461". Act-specific sections also yield the bare
+    "section:" key, so a query for "Section 420" finds "IPC 420"
+    """
+    entities = document_processor.extract_key_entities(text)
+    keys = []
+    for act in ACTS:
+        for number in entities[f"{act}_sections"]:
+            keys.append(f"{act}:{number.lower()}")
+            keys.append(f"section:{number.lower()}")
+    keys.extend(f"section:{number.lower()}" for number in BARE_SECTION_PATTERN.findall(text))
+    keys.extend(f"case:{_normalize(ref)}" for ref in entities["case_references"])
+    return list(dict.fromkeys(keys))
+
+
+class CitationIndex:
+    """
+    Posting lists of chunk ids keyed by normalized legal citation (SQLite)
+    Gives queries that name a section or case a direct lookup path to the
+    chunks citing it, independent of the vector search
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS citation_postings (
+                    citation TEXT NOT NULL,
+                    vector_id INTEGER NOT NULL,
+                    document_number INTEGER NOT NULL,
+                    PRIMARY KEY (citation, vector_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_citation_document ON citation_postings(document_number)")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+
+    def add(self, vector_ids: List[int], document_number: int, texts: List[str]):
+        """Extract and index the citations of one document's chunks"""
+        postings = [
+            (citation, vector_id, document_number)
+            for vector_id, text in zip(vector_ids, texts)
+            for citation in extract_citations(text)
+        ]
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO citation_postings (citation, vector_id, document_number) VALUES (?, ?, ?)",
+                postings
+            )
+            conn.commit()
+
+    def remove_document(self, document_number: int):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM citation_postings WHERE document_number = ?", (document_number,))
+            conn.commit()
+
+    def lookup(self, citations: List[str], document_numbers: List[int] = None) -> List[int]:
+        """
+        Chunks citing any of the given citations
+
+        Args:
+            citations: Normalized citation keys (see extract_citations)
+            document_numbers: Documents to search (None = all)
+
+        Returns:
+            Vector ids, chunks matching more of the citations first
+        """
+        if not citations:
+            return []
+
+        sql = f"""
+            SELECT vector_id, COUNT(*) AS matched FROM citation_postings
+            WHERE citation IN ({','.join('?' * len(citations))})
+        """
+        params = list(citations)
+        if document_numbers is not None:
+            sql += f" AND document_number IN ({','.join('?' * len(document_numbers))})"
+            params += list(document_numbers)
+        sql += " GROUP BY vector_id ORDER BY matched DESC, vector_id"
+
+        with connect(self.db_path) as conn:
+            return [r[0] for r in conn.execute(sql, params).fetchall()]
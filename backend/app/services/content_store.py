@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from app.db.database import connect
+from app.services.faiss_store import faiss_store
+
+CONTENT_STORE_FILE = "content_store.db"
+
+
+class ContentRecorder:
+    """
+    Collects the artifacts of one ingestion as it streams (pages, then chunk
+    batches) and writes them to the content store per batch. The content only
+    becomes visible to lookups on commit(), so a failed ingestion leaves
+    nothing reusable behind
+    """
+
+    def __init__(self, store: "ContentStore", sha256: str):
+        self.store = store
+        self.sha256 = sha256
+        self._pages = []
+        self._page_count = 0
+        self._chunk_count = 0
+        self._parent_count = 0
+        self.store._discard(sha256)
+
+    def page(self, text: str, meta: Dict):
+        self._pages.append((text, meta))
+
+    def batch(self, chunks: List[str], metas: List[Dict], parents: List[str]):
+        """Record one indexed batch and the pages it came from; parent positions become document-wide"""
+        offset = self._parent_count
+        metas = [{**m, "parent": m["parent"] + offset} if "parent" in m else m for m in metas]
+        with connect(self.store.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT INTO content_pages (sha256, position, text, metadata) VALUES (?, ?, ?, ?)",
+                [(self.sha256, self._page_count + i, text, json.dumps(meta)) for i, (text, meta) in enumerate(self._pages)]
+            )
+            cursor.executemany(
+                "INSERT INTO content_chunks (sha256, position, text, metadata) VALUES (?, ?, ?, ?)",
+                [(self.sha256, self._chunk_count + i, text, json.dumps(meta)) for i, (text, meta) in enumerate(zip(chunks, metas))]
+            )
+            cursor.executemany(
+                "INSERT INTO content_parents (sha256, position, text) VALUES (?, ?, ?)",
+                [(self.sha256, offset + i, text) for i, text in enumerate(parents)]
+            )
+            conn.commit()
+        self._page_count += len(self._pages)
+        self._chunk_count += len(chunks)
+        self._parent_count += len(parents)
+        self._pages = []
+
+    def commit(self, document_type: str, chunking: str):
+        with connect(self.store.db_path) as conn:
+            cursor = conn.cursor()
+            if self._pages:
+                # Trailing pages that produced no chunks
+                cursor.executemany(
+                    "INSERT INTO content_pages (sha256, position, text, metadata) VALUES (?, ?, ?, ?)",
+                    [(self.sha256, self._page_count + i, text, json.dumps(meta)) for i, (text, meta) in enumerate(self._pages)]
+                )
+                self._page_count += len(self._pages)
+                self._pages = []
+            now = datetime.now().isoformat()
+            cursor.execute(
+                """INSERT OR REPLACE INTO content_documents
+                   (sha256, document_type, chunking, page_count, chunk_count, created_at, last_used_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (self.sha256, document_type, chunking, self._page_count, self._chunk_count, now, now)
+            )
+            conn.commit()
+        self.store._release(self.sha256)
+
+    def abort(self):
+        """Drop what was recorded (the ingestion failed)"""
+        self.store._discard(self.sha256)
+        self.store._release(self.sha256)
+
+
+class ContentStore:
+    """
+    Content-addressed store of processed uploads (SQLite), keyed by the
+    SHA-256 of the uploaded bytes: extracted page texts (or transcript),
+    chunks with their metadata, and hierarchical parents. Chunk vectors live
+    in the shared embedding cache, keyed by chunk text, so re-indexing stored
+    chunks never runs the model. An identical re-upload is linked to its new
+    document id by re-adding these chunks instead of re-processing the file
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._recording = set()  # hashes with a recorder in progress
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            # Written last by ContentRecorder.commit, so its presence marks complete content
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS content_documents (
+                    sha256 TEXT PRIMARY KEY,
+                    document_type TEXT NOT NULL,
+                    chunking TEXT NOT NULL,
+                    page_count INTEGER NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    created_at TIMESTAMP NOT NULL,
+                    last_used_at TIMESTAMP NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS content_pages (
+                    sha256 TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    PRIMARY KEY (sha256, position)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS content_chunks (
+                    sha256 TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    PRIMARY KEY (sha256, position)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS content_parents (
+                    sha256 TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (sha256, position)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+
+    def recorder(self, sha256: str) -> Optional[ContentRecorder]:
+        """Start recording the artifacts of a new upload, None if the same content is already being recorded"""
+        with self._lock:
+            if sha256 in self._recording:
+                return None
+            self._recording.add(sha256)
+        return ContentRecorder(self, sha256)
+
+    def _release(self, sha256: str):
+        with self._lock:
+            self._recording.discard(sha256)
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        """Summary of stored content (document_type, chunking, page_count, chunk_count), None if unknown"""
+        with connect(self.db_path) as conn:
+            # Touched before it is read, so purge() either sees the reuse or removes it first
+            conn.execute(
+                "UPDATE content_documents SET last_used_at = ? WHERE sha256 = ?",
+                (datetime.now().isoformat(), sha256)
+            )
+            conn.commit()
+            row = conn.execute("SELECT * FROM content_documents WHERE sha256 = ?", (sha256,)).fetchone()
+            return dict(row) if row is not None else None
+
+    def pages(self, sha256: str) -> List[tuple]:
+        """(text, metadata) per extracted page, in order"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT text, metadata FROM content_pages WHERE sha256 = ? ORDER BY position", (sha256,)
+            ).fetchall()
+            return [(r["text"], json.loads(r["metadata"])) for r in rows]
+
+    def chunks(self, sha256: str) -> tuple:
+        """(chunks, metadatas, parents); chunk metadata 'parent' is a position in parents"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT text, metadata FROM content_chunks WHERE sha256 = ? ORDER BY position", (sha256,)
+            ).fetchall()
+            parents = conn.execute(
+                "SELECT text FROM content_parents WHERE sha256 = ? ORDER BY position", (sha256,)
+            ).fetchall()
+            return [r["text"] for r in rows], [json.loads(r["metadata"]) for r in rows], [r["text"] for r in parents]
+
+    def _discard(self, sha256: str):
+        """Drop any (possibly partial) content under a hash"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            for table in ("content_documents", "content_pages", "content_chunks", "content_parents"):
+                cursor.execute(f"DELETE FROM {table} WHERE sha256 = ?", (sha256,))
+            conn.commit()
+
+    def purge(self, referenced: Set[str], retention_seconds: int) -> int:
+        """
+        Delete content no document refers to any more, once unused for
+        retention_seconds, and partial content of ingestions that died
+
+        Args:
+            referenced: Hashes of listed documents and of uploads still being ingested
+            retention_seconds: How long unreferenced content stays reusable after its last use
+
+        Returns:
+            Number of hashes removed
+        """
+        cutoff = (datetime.now() - timedelta(seconds=retention_seconds)).isoformat()
+        removed = 0
+        # Held throughout, so no recorder starts on a hash while it is being removed
+        with self._lock, connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            stale = [
+                row["sha256"]
+                for row in cursor.execute("SELECT sha256 FROM content_documents WHERE last_used_at < ?", (cutoff,))
+                if row["sha256"] not in referenced
+            ]
+            for sha256 in stale:
+                # Re-checked in the delete: a job may have picked it up since
+                cursor.execute(
+                    "DELETE FROM content_documents WHERE sha256 = ? AND last_used_at < ?", (sha256, cutoff)
+                )
+                if cursor.rowcount:
+                    for table in ("content_pages", "content_chunks", "content_parents"):
+                        cursor.execute(f"DELETE FROM {table} WHERE sha256 = ?", (sha256,))
+                    removed += 1
+                conn.commit()
+
+            partial = set()
+            for table in ("content_pages", "content_chunks", "content_parents"):
+                partial.update(
+                    row["sha256"] for row in cursor.execute(
+                        f"SELECT DISTINCT sha256 FROM {table} WHERE sha256 NOT IN (SELECT sha256 FROM content_documents)"
+                    )
+                )
+            for sha256 in partial - self._recording:
+                for table in ("content_pages", "content_chunks", "content_parents"):
+                    cursor.execute(f"DELETE FROM {table} WHERE sha256 = ?", (sha256,))
+                removed += 1
+            conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS documents, COALESCE(SUM(chunk_count), 0) AS chunks FROM content_documents"
+            ).fetchone()
+            return {"documents": row["documents"], "chunks": row["chunks"]}
+
+
+# Global instance
+content_store = ContentStore(os.path.join(faiss_store.persist_directory, CONTENT_STORE_FILE))
@@ -1,16 +1,88 @@
+import multiprocessing
 import os
-import io
-import tempfile
 import re
-from typing import List, Dict, Tuple
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
 from PyPDF2 import PdfReader
 import pytesseract
 from pdf2image import convert_from_path
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from app.core.config import OCR_WORKERS
+
 # Configure Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+# Patterns for legal content, compiled once; a line matching either keeps the
+# chunk open so a reference stays with the text that follows it
+SECTION_PATTERN = re.compile(
+    r"(Section\s+\d+[A-Z]?|IPC\s+\d+|CrPC\s+\d+|BNS\s+\d+)",
+    re.IGNORECASE
+)
+CASE_REFERENCE = re.compile(
+    r"(v\.|vs\.|versus|AIR\s+\d+|SCC\s+\d+)",
+    re.IGNORECASE
+)
+# Both as one case-sensitive pattern over lower-cased lines: re.IGNORECASE
+# defeats the regex engine's literal prefix scan and costs ~3x on long text
+_LEGAL_REFERENCE_LOWER = re.compile(r"(?:section|ipc|crpc|bns|air|scc)\s+\d|v\.|vs\.|versus")
+
+
+def _has_legal_reference(line: str) -> bool:
+    """SECTION_PATTERN.search(line) or CASE_REFERENCE.search(line)"""
+    if line.isascii():
+        return _LEGAL_REFERENCE_LOWER.search(line.lower()) is not None
+    # Unicode case folding (e.g. the Kelvin sign) differs from str.lower
+    return bool(SECTION_PATTERN.search(line) or CASE_REFERENCE.search(line))
+
+# Line-buffer length at which legal_aware_chunking closes a chunk
+LEGAL_CHUNK_TARGET = 800
+
+# Splitters hold no per-call state, so one instance serves every call and thread
+LEGAL_SPLIT_SIZE = 900
+LEGAL_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=LEGAL_SPLIT_SIZE,
+    chunk_overlap=200,
+    separators=["\n\n", "\n", ". ", " ", ""]
+)
+
+
+@lru_cache(maxsize=8)
+def _child_splitter(child_size: int) -> RecursiveCharacterTextSplitter:
+    """Non-overlapping splitter for hierarchical_chunking children"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=child_size,
+        chunk_overlap=0,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+
+def _init_ocr_worker():
+    # Parallelism comes from the pool; one Tesseract thread per process avoids oversubscription
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_page(pdf_path: str, page_num: int) -> Tuple[int, List[str], Dict]:
+    """
+    Rasterize and OCR one page (runs in a worker process)
+
+    Returns:
+        Tuple of (page_num, texts (one per image), timing dict)
+    """
+    start = time.perf_counter()
+    images = convert_from_path(pdf_path, first_page=page_num + 1, last_page=page_num + 1)
+    rasterized = time.perf_counter()
+    texts = [pytesseract.image_to_string(img) for img in images]
+    done = time.perf_counter()
+    return page_num, texts, {
+        "rasterize_ms": round((rasterized - start) * 1000, 1),
+        "ocr_ms": round((done - rasterized) * 1000, 1)
+    }
+
 
 class DocumentProcessor:
     """
@@ -18,57 +90,97 @@ class DocumentProcessor:
     Extract text, chunk intelligently for legal content
     """
 
-    def __init__(self):
-        pass
-
-    def process_pdf(self, uploaded_pdf) -> Tuple[List[str], List[Dict]]:
+    def __init__(self, ocr_workers: int = 0):
         """
-        Extract text from PDF with OCR fallback
-
         Args:
-            uploaded_pdf: Uploaded PDF file object
-
-        Returns:
-            Tuple of (texts, metadata)
+            ocr_workers: Processes for OCR of scanned pages (0 = CPU count)
         """
-        if isinstance(uploaded_pdf, list):
-            uploaded_pdf = uploaded_pdf[0]
-
-        pdf_stream = io.BytesIO(uploaded_pdf.read())
-        reader = PdfReader(pdf_stream)
+        self.ocr_workers = ocr_workers or os.cpu_count() or 1
+        self._ocr_pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def ocr_pool(self) -> ProcessPoolExecutor:
+        """OCR worker processes, started on the first scanned page and reused"""
+        if self._ocr_pool is None:
+            with self._pool_lock:
+                if self._ocr_pool is None:
+                    # Spawned, not forked: the server process runs other thread pools, and a
+                    # fork taken while one of their threads holds a lock can deadlock the child
+                    self._ocr_pool = ProcessPoolExecutor(
+                        max_workers=self.ocr_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_ocr_worker
+                    )
+        return self._ocr_pool
 
-        texts, metadata = [], []
-        total_pages = len(reader.pages)
-        print(f"[PDF] Processing '{uploaded_pdf.name}' — {total_pages} page(s)")
+    def iter_pdf_pages(self, pdf_path: str, source_name: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream (text, metadata) per page of a PDF on disk, in page order
 
-        for page_num, page in enumerate(reader.pages):
-            try:
-                text = page.extract_text()
-            except Exception:
-                continue
+        Text layers are read as the pages are pulled; pages without one are
+        OCR'd in the worker pool. A page is yielded as soon as it and every
+        page before it are ready, and at most two pages per worker (text or
+        OCR) are buffered behind the one being waited on, so memory stays
+        bounded by that window
 
-            if text and text.strip():
-                print(f"[PDF] Page {page_num + 1}: extracted {len(text)} chars")
-                texts.append(text)
-                metadata.append({"source": uploaded_pdf.name, "page": page_num})
-            else:
-                print(f"[PDF] Page {page_num + 1}: no text found, running OCR...")
-                # Use OCR for scanned documents
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    tmp.write(pdf_stream.getbuffer())
-                    tmp.close()
-                    images = convert_from_path(
-                        tmp.name, first_page=page_num + 1, last_page=page_num + 1
-                    )
-                    for img in images:
-                        ocr_text = pytesseract.image_to_string(img)
-                        texts.append(ocr_text)
-                        metadata.append(
-                            {"source": uploaded_pdf.name, "page": page_num, "ocr": True}
-                        )
-                    os.remove(tmp.name)
+        Args:
+            pdf_path: Path to the PDF (shared with the OCR workers)
+            source_name: File name recorded as 'source' in the metadata
+        """
+        start = time.perf_counter()
+        timings = []  # per page: page, method, extract_ms, and rasterize_ms/ocr_ms for OCR
+        window = self.ocr_workers * 2
+        pending = deque()  # (page_num, text, OCR future, timing) awaiting their turn
+
+        with open(pdf_path, "rb") as pdf_file:
+            reader = PdfReader(pdf_file)
+            total_pages = len(reader.pages)
+            print(f"[PDF] Processing '{source_name}' — {total_pages} page(s)")
+
+            for page_num, page in enumerate(reader.pages):
+                page_start = time.perf_counter()
+                try:
+                    text = page.extract_text()
+                except Exception:
+                    continue
+                timing = {"page": page_num, "method": "text", "extract_ms": round((time.perf_counter() - page_start) * 1000, 1)}
+
+                if text and text.strip():
+                    print(f"[PDF] Page {page_num + 1}: extracted {len(text)} chars")
+                    pending.append((page_num, text, None, timing))
+                else:
+                    pending.append((page_num, None, self.ocr_pool.submit(_ocr_page, pdf_path, page_num), timing))
+
+                # Emit pages whose text is ready; block on OCR only once the window is full
+                while pending and (pending[0][2] is None or pending[0][2].done() or len(pending) > window):
+                    yield from self._finish_page(*pending.popleft(), source_name, timings)
+
+            while pending:
+                yield from self._finish_page(*pending.popleft(), source_name, timings)
+
+        ocr_timings = [t for t in timings if t["method"] == "ocr"]
+        ocr_seconds = sum(t["rasterize_ms"] + t["ocr_ms"] for t in ocr_timings) / 1000
+        print(
+            f"[PDF] Extracted {len(timings) - len(ocr_timings)} text page(s), OCR'd {len(ocr_timings)} "
+            f"in {time.perf_counter() - start:.2f}s ({ocr_seconds:.2f}s of OCR work)"
+        )
 
-        return texts, metadata
+    @staticmethod
+    def _finish_page(page_num, text, future, timing, source_name, timings) -> Iterator[Tuple[str, Dict]]:
+        timings.append(timing)
+        if future is None:
+            yield text, {"source": source_name, "page": page_num}
+            return
+
+        _, ocr_texts, page_timing = future.result()
+        timing.update(page_timing, method="ocr")
+        print(
+            f"[PDF] Page {page_num + 1}: OCR {sum(len(t) for t in ocr_texts)} chars "
+            f"(rasterize {page_timing['rasterize_ms']}ms, ocr {page_timing['ocr_ms']}ms)"
+        )
+        for ocr_text in ocr_texts:
+            yield ocr_text, {"source": source_name, "page": page_num, "ocr": True}
 
     def legal_aware_chunking(self, text: str) -> List[str]:
         """
@@ -81,45 +193,36 @@ class DocumentProcessor:
         Returns:
             List of text chunks
         """
-        # Patterns for legal content
-        SECTION_PATTERN = re.compile(
-            r"(Section\s+\d+[A-Z]?|IPC\s+\d+|CrPC\s+\d+|BNS\s+\d+)",
-            re.IGNORECASE
-        )
-        CASE_REFERENCE = re.compile(
-            r"(v\.|vs\.|versus|AIR\s+\d+|SCC\s+\d+)",
-            re.IGNORECASE
-        )
-
-        lines = text.split("\n")
-        buffer, chunks = [], []
+        chunks, buffer, length = [], [], 0
 
-        for line in lines:
+        for line in text.split("\n"):
+            # length tracks len(" ".join(buffer)) without re-joining the buffer per line
+            length += len(line) + 1 if buffer else len(line)
             buffer.append(line)
 
             # Keep section references together
-            if SECTION_PATTERN.search(line) or CASE_REFERENCE.search(line):
+            if _has_legal_reference(line):
                 continue
 
             # Chunk when buffer gets large
-            if len(" ".join(buffer)) > 800:
+            if length > LEGAL_CHUNK_TARGET:
                 chunks.append(" ".join(buffer))
-                buffer = []
+                buffer, length = [], 0
 
         if buffer:
             chunks.append(" ".join(buffer))
 
-        # Use RecursiveCharacterTextSplitter for final refinement
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=900,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-
+        # RecursiveCharacterTextSplitter for final refinement; a chunk shorter
+        # than its chunk_size comes back whole (stripped), so skip the call
         final_chunks = []
         for chunk in chunks:
-            if chunk.strip():
-                final_chunks.extend(splitter.split_text(chunk))
+            stripped = chunk.strip()
+            if not stripped:
+                continue
+            if len(chunk) < LEGAL_SPLIT_SIZE:
+                final_chunks.append(stripped)
+            else:
+                final_chunks.extend(LEGAL_SPLITTER.split_text(chunk))
 
         return final_chunks
 
@@ -140,14 +243,61 @@ class DocumentProcessor:
             chunks = self.legal_aware_chunking(text)
             all_chunks.extend(chunks)
 
-            # Add metadata with text content
-            for chunk in chunks:
-                meta_with_text = meta.copy()
-                meta_with_text["text"] = chunk
-                all_meta.append(meta_with_text)
+            # The chunk text itself lives in all_chunks; metadata stays compact
+            all_meta.extend(meta.copy() for _ in chunks)
 
         return all_chunks, all_meta
 
+    def hierarchical_chunking(
+        self,
+        text_list: List[str],
+        metadata_list: List[Dict],
+        child_size: int = 800,
+        parent_size: int = 2000
+    ) -> Tuple[List[str], List[Dict], List[str]]:
+        """
+        Two-level chunking: each page is split into non-overlapping child
+        chunks for embedding, and the page is their parent (long pages are
+        split into consecutive runs of children of at most parent_size
+        characters). Search matches the small children; the LLM gets the
+        surrounding parent
+
+        Args:
+            text_list: List of page texts (from iter_pdf_pages)
+            metadata_list: List of page metadata dicts
+            child_size: Maximum child chunk length in characters
+            parent_size: Maximum parent length in characters
+
+        Returns:
+            Tuple of (child_chunks, child_metadata, parents); each child's
+            metadata 'parent' is the index of its parent in parents
+        """
+        child_splitter = _child_splitter(child_size)
+
+        children, child_meta, parents = [], [], []
+        for text, meta in zip(text_list, metadata_list):
+            page_children = [c for c in child_splitter.split_text(text) if c.strip()]
+            if not page_children:
+                continue
+            if len(text) <= parent_size:
+                groups = [(text.strip(), page_children)]
+            else:
+                groups, group, length = [], [], 0
+                for child in page_children:
+                    if group and length + len(child) + 1 > parent_size:
+                        groups.append((" ".join(group), group))
+                        group, length = [], 0
+                    group.append(child)
+                    length += len(child) + 1
+                groups.append((" ".join(group), group))
+
+            for parent, group in groups:
+                children.extend(group)
+                child_meta.extend({**meta, "parent": len(parents)} for _ in group)
+                parents.append(parent)
+
+        return children, child_meta, parents
+
     def extract_key_entities(self, text: str) -> Dict[str, List[str]]:
         """
         Extract key legal entities from text
@@ -179,7 +329,12 @@ class DocumentProcessor:
         entities["bns_sections"] = [m[0] or m[1] for m in bns_matches if m[0] or m[1]]
 
         # Case references
-        case_matches = re.findall(r"(\w+\s+v\.\s+\w+|AIR\s+\d+|SCC\s+\d+)", text, re.IGNORECASE)
+        # Reporter citations keep court and page when present: "AIR 1973 SC 1461", "(2014) 8 SCC 273"
+        case_matches = re.findall(
+            r"(\w+\s+v\.\s+\w+|AIR\s+\d{4}(?:\s+[A-Z]+\s+\d+)?|(?:\(\d{4}\)\s+\d+\s+)?SCC\s+\d+)",
+            text,
+            re.IGNORECASE
+        )
         entities["case_references"] = case_matches
 
         # Dates
@@ -190,4 +345,4 @@ class DocumentProcessor:
 
 
 # Global instance
-document_processor = DocumentProcessor()
+document_processor = DocumentProcessor(OCR_WORKERS)
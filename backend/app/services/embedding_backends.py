@@ -0,0 +1,239 @@
+import os
+import re
+import threading
+import zlib
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import (
+    EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_THREADS,
+    EMBEDDING_ONNX_QUANTIZE, EMBEDDING_ONNX_DIR, EMBEDDING_HASH_DIM
+)
+
+HASH_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class EmbeddingBackend:
+    """
+    Interface for sentence embedding engines used by the vector store
+    Models are loaded lazily on first use; constructing a backend is cheap
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32, num_threads: int = 0):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads  # 0 = library default
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the vectors this backend produces (used by the embedding cache)"""
+        return self.model_name
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0].tolist()
+
+
+class HuggingFaceBackend(EmbeddingBackend):
+    """
+    Reference implementation: sentence-transformers on PyTorch (fp32)
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32, num_threads: int = 0):
+        super().__init__(model_name, batch_size, num_threads)
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model(self):
+        # Locked so a request arriving during warm-up waits for that load instead of starting another
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    if self.num_threads:
+                        import torch
+                        torch.set_num_threads(self.num_threads)
+                    self._model = HuggingFaceEmbeddings(
+                        model_name=self.model_name,
+                        encode_kwargs={"batch_size": self.batch_size}
+                    )
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.embed_documents(texts), dtype=np.float32)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.embed_query(text)
+
+
+class OnnxRuntimeBackend(EmbeddingBackend):
+    """
+    CPU-optimized engine: the transformer exported to ONNX and run with
+    ONNX Runtime, optionally with int8 dynamically quantized weights.
+    Applies the same mean pooling + L2 normalization as the
+    sentence-transformers pipeline of all-mpnet-base-v2
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        num_threads: int = 0,
+        quantize: bool = True,
+        model_dir: str = "onnx_models"
+    ):
+        super().__init__(model_name, batch_size, num_threads)
+        self.quantize = quantize
+        self.model_dir = model_dir
+        self._session = None
+        self._tokenizer = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def cache_key(self) -> str:
+        # int8 weights give slightly different vectors than the fp32 reference
+        return f"onnx-int8:{self.model_name}" if self.quantize else f"onnx:{self.model_name}"
+
+    def _load(self):
+        with self._load_lock:
+            if self._session is None:
+                self._load_session()
+
+    def _load_session(self):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        export_dir = os.path.join(self.model_dir, self.model_name.replace("/", "__"))
+        model_path = os.path.join(export_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            # One-time export with optimum; later starts load the .onnx file directly
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            print(f"Exporting {self.model_name} to ONNX: {export_dir}")
+            ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True).save_pretrained(export_dir)
+            AutoTokenizer.from_pretrained(self.model_name).save_pretrained(export_dir)
+
+        if self.quantize:
+            quantized_path = os.path.join(export_dir, "model.int8.onnx")
+            if not os.path.exists(quantized_path):
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                print(f"Quantizing {self.model_name} to int8")
+                quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+            model_path = quantized_path
+
+        options = ort.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self._tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        print(f"ONNX Runtime embedding model loaded: {model_path}")
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        if self._session is None:
+            self._load()
+
+        input_names = {i.name for i in self._session.get_inputs()}
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self._tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=384,
+                return_tensors="np"
+            )
+            inputs = {k: v.astype(np.int64) for k, v in encoded.items() if k in input_names}
+            token_embeddings = self._session.run(None, inputs)[0]
+
+            # Mean pooling over real tokens, then L2 normalize
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+
+        return np.vstack(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Deterministic feature-hashing embeddings: word unigrams, word bigrams and
+    character 3-5-grams hashed (CRC32, signed) into a fixed number of buckets,
+    log-scaled and L2 normalized. No model download and identical vectors on
+    every machine, for CI benchmarks and nodes without torch. Retrieval is
+    lexical-overlap quality, not semantic
+    """
+
+    def __init__(self, dimension: int = 768, batch_size: int = 32, num_threads: int = 0):
+        super().__init__(f"hashing-{dimension}", batch_size, num_threads)
+        self.dimension = dimension
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.model_name}-v1"
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = HASH_TOKEN_PATTERN.findall(text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            for n in (3, 4, 5):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(zlib.crc32(f.encode("utf-8")) for f in features)
+
+        # Scatter all feature hashes at once: low bits pick the bucket, the top bit the sign
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        buckets = (hashes % self.dimension).astype(np.int64)
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        np.add.at(vectors, (np.asarray(rows, dtype=np.int64), buckets), signs)
+
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors
+
+
+class LangChainEmbeddings(Embeddings):
+    """Adapts an EmbeddingBackend to the LangChain Embeddings interface"""
+
+    def __init__(self, backend: EmbeddingBackend):
+        self.backend = backend
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.backend.embed_documents(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self.backend.embed_query(text))
+
+
+def get_embedding_backend(
+    backend: str = EMBEDDING_BACKEND,
+    model_name: str = EMBEDDING_MODEL,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    num_threads: int = EMBEDDING_THREADS
+) -> EmbeddingBackend:
+    """Build the configured embedding backend (hf, onnx or hashing)"""
+    if backend == "hf":
+        return HuggingFaceBackend(model_name, batch_size, num_threads)
+    if backend == "onnx":
+        return OnnxRuntimeBackend(
+            model_name, batch_size, num_threads,
+            quantize=EMBEDDING_ONNX_QUANTIZE,
+            model_dir=EMBEDDING_ONNX_DIR
+        )
+    if backend == "hashing":
+        return HashingBackend(EMBEDDING_HASH_DIM, batch_size, num_threads)
+    raise ValueError(f"Unknown embedding backend: {backend}. Supported: hf, onnx, hashing")
@@ -0,0 +1,106 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List
+import numpy as np
+
+from app.db.database import connect
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Collapse whitespace so re-extracted copies of the same chunk hash alike"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache shared across sessions (SQLite)
+    Keyed by (model name, normalized chunk text hash), so statutes, judgments
+    and templates uploaded into many sessions are embedded only once
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+            conn.commit()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors -> {text_hash: float32 vector}"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with connect(self.db_path) as conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model] + batch
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, hashes: List[str], vectors: np.ndarray):
+        with connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [
+                    (model, text_hash, np.asarray(vector, dtype=np.float32).tobytes())
+                    for text_hash, vector in zip(hashes, vectors)
+                ]
+            )
+            conn.commit()
+
+    def embed_documents(self, embeddings, model: str, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, computing only the cache misses
+
+        Args:
+            embeddings: Embedding model with embed_documents()
+            model: Model name used as part of the cache key
+            texts: Chunk texts
+
+        Returns:
+            (n, dim) float32 array in the order of texts
+        """
+        hashes = [chunk_hash(text) for text in texts]
+        cached = self.get_many(model, hashes)
+
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = np.asarray(embeddings.embed_documents(list(missing.values())), dtype=np.float32)
+            self.put_many(model, list(missing.keys()), computed)
+            cached.update(zip(missing.keys(), computed))
+
+        return np.vstack([cached[text_hash] for text_hash in hashes]).astype(np.float32)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -1,10 +1,664 @@
+import heapq
 import os
 import pickle
-from typing import List, Dict, Any
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Tuple
 import numpy as np
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain.docstore.document import Document
+import faiss
+
+from app.core.config import (
+    FAISS_INDEX_DIR, FAISS_MEMORY_BUDGET_MB, FAISS_INDEX_TTL_SECONDS, FAISS_INDEX_TYPE, FAISS_IVF_NPROBE,
+    FAISS_MAX_SEGMENTS,
+    RETRIEVAL_MODE,
+    VECTOR_STORE_QUERY_WORKERS, VECTOR_STORE_INGEST_WORKERS
+)
+from app.core.executor import InstrumentedExecutor
+from app.services.chunk_store import ChunkStore
+from app.services.citation_index import CitationIndex, extract_citations
+from app.services.embedding_backends import get_embedding_backend
+from app.services.embedding_cache import EmbeddingCache, chunk_hash
+from app.services.index_catalog import IndexCatalog
+from app.services.lexical_index import LexicalIndex
+from app.services import index_factory
+from app.services.index_residency import IndexResidencyManager
+
+# Vector ids are (document number << DOC_ID_SHIFT) | chunk number, so every
+# document owns one contiguous id range that FAISS can filter on natively.
+DOC_ID_SHIFT = 32
+
+INDEX_FILE = "session.faiss"
+CHUNK_STORE_FILE = "chunks.db"
+LEXICAL_INDEX_FILE = "lexical.db"
+CITATION_INDEX_FILE = "citations.db"
+CATALOG_FILE = "catalog.db"
+EMBEDDING_CACHE_FILE = "embedding_cache.db"
+
+# Per-document LangChain indexes written before session indexes existed:
+# {session_id}_{document_id}/index.faiss plus a pickled docstore, embedded
+# with this model
+LEGACY_INDEX_FILE = "index.faiss"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+LEGACY_EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+# Map vector codes straight from the page cache: IVF inverted lists via IO_FLAG_MMAP,
+# flat/SQ codes via IO_FLAG_MMAP_IFC (older faiss builds can only map IVF lists)
+FLAT_MMAP_SUPPORTED = hasattr(faiss, "IO_FLAG_MMAP_IFC")
+IVF_MMAP_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+FLAT_MMAP_FLAGS = (faiss.IO_FLAG_MMAP_IFC if FLAT_MMAP_SUPPORTED else faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+# Compact once removed documents make up this share of the stored vectors
+COMPACTION_DEAD_FRACTION = 0.25
+
+# Reciprocal rank fusion constant; damps the influence of the top few ranks
+RRF_K = 60
+
+
+def _mmap_flags(index_file: str) -> int:
+    """Pick mmap flags from the index file's fourcc header (IVF files start with 'Iw')"""
+    with open(index_file, "rb") as f:
+        return IVF_MMAP_FLAGS if f.read(2) == b"Iw" else FLAT_MMAP_FLAGS
+
+
+def _codes_mapped(index) -> bool:
+    """Whether a read index keeps its vector codes in the mapped file rather than on the heap"""
+    return FLAT_MMAP_SUPPORTED or index_factory.is_ivf(index)
+
+
+def _normalized(vectors) -> np.ndarray:
+    """Float32 copy of vectors scaled to unit length, so inner product = cosine similarity"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def merge_top_k(rankings: Iterable[Iterable[Tuple[int, float]]], k: int) -> List[Tuple[int, float]]:
+    """
+    Heap-based k-way merge of rankings whose scores are comparable (higher is better)
+
+    Each ranking must be sorted best first. It is consumed lazily and abandoned
+    as soon as its next score cannot beat the current k-th result, so a ranking
+    whose best hit is already out of reach costs a single comparison
+
+    Args:
+        rankings: Iterables of (vector_id, score), best first
+        k: Number of results to keep
+
+    Returns:
+        Up to k (vector_id, score) pairs, best first
+    """
+    heap = []  # min-heap of the best k (score, vector_id) seen so far
+    for ranking in rankings:
+        for vector_id, score in ranking:
+            if len(heap) < k:
+                heapq.heappush(heap, (score, vector_id))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, vector_id))
+            else:
+                break
+    return [(vector_id, score) for score, vector_id in sorted(heap, reverse=True)]
+
+
+class _LegacyState:
+    """Stand-in for the LangChain docstore/Document classes in a legacy index.pkl; keeps only their state"""
+
+    def __setstate__(self, state):
+        self.state = state
+
+    def field(self, name: str):
+        # Pydantic models pickle their fields under '__dict__', plain objects as the state itself
+        return self.state.get("__dict__", self.state).get(name)
+
+
+class _LegacyDocstoreUnpickler(pickle.Unpickler):
+    """Reads a legacy docstore without LangChain installed, and refuses any class but those stand-ins"""
+
+    def find_class(self, module: str, name: str):
+        if module.split(".")[0] in ("langchain", "langchain_core", "langchain_community"):
+            return _LegacyState
+        if (module, name) in (("copyreg", "__newobj__"), ("copyreg", "_reconstructor"), ("builtins", "object")):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Unexpected class in legacy docstore: {module}.{name}")
+
+
+def read_legacy_index(path: str) -> Tuple[List[str], List[Dict], np.ndarray]:
+    """
+    Load a per-document index in the pre-session layout
+
+    Returns:
+        Tuple of (texts, metadatas, vectors) in index order
+    """
+    index = faiss.read_index(os.path.join(path, LEGACY_INDEX_FILE))
+    with open(os.path.join(path, LEGACY_DOCSTORE_FILE), "rb") as f:
+        docstore, index_to_docstore_id = _LegacyDocstoreUnpickler(f).load()
+
+    documents = docstore.field("_dict")
+    texts, metadatas = [], []
+    for position in range(index.ntotal):
+        document = documents[index_to_docstore_id[position]]
+        texts.append(document.field("page_content"))
+        metadatas.append(dict(document.field("metadata") or {}))
+    return texts, metadatas, index.reconstruct_n(0, index.ntotal)
+
+
+def is_legacy_index(path: str) -> bool:
+    return os.path.exists(os.path.join(path, LEGACY_INDEX_FILE)) and os.path.exists(os.path.join(path, LEGACY_DOCSTORE_FILE))
+
+
+class SessionIndex:
+    """
+    FAISS index holding the chunks of every document in a session
+    Documents are tagged with integer document numbers so a document_ids
+    restriction becomes an id-selector filter inside one search call.
+    Vectors are L2-normalized and searched by inner product, so scores are
+    cosine similarities comparable across indexes.
+
+    On disk the index is a log: a compacted base file plus append-only
+    segment files, one per added document. Removing a document tombstones
+    its id range. Compaction folds segments and tombstones into a new base,
+    so uploads and deletes only write their delta
+    """
+
+    def __init__(self, path: str, index=None):
+        self.path = path
+        self.chunk_store = ChunkStore(os.path.join(path, CHUNK_STORE_FILE))
+        self.lexical_index = LexicalIndex(os.path.join(path, LEXICAL_INDEX_FILE))
+        self.citation_index = CitationIndex(os.path.join(path, CITATION_INDEX_FILE))
+        self.document_numbers = self.chunk_store.document_numbers()  # document_id -> document number
+        self.tombstones = self.chunk_store.tombstones()  # removed document number -> vector count
+        self.base_file = self.chunk_store.base_file() or INDEX_FILE
+        self._last_segment = self.chunk_store.last_segment_number()
+
+        # Base index and segments; saved ones are read-only views of the on-disk vectors
+        self.index = index
+        self.mmapped = False
+        self._base_dirty = False
+        self.segments = []  # dicts: number, file_name, index, doc_numbers, saved
+        if index is None:
+            self.index = self._read(self.base_file)
+            self.mmapped = _codes_mapped(self.index)
+            for number, file_name in self.chunk_store.segments().items():
+                segment_index = self._read(file_name)
+                self.segments.append({
+                    "number": number,
+                    "file_name": file_name,
+                    "index": segment_index,
+                    "doc_numbers": self._doc_numbers_of(segment_index),
+                    "saved": True
+                })
+
+    @classmethod
+    def create(cls, dimension: int, path: str) -> "SessionIndex":
+        """Start an empty session index stored under path"""
+        os.makedirs(path, exist_ok=True)
+        return cls(path, index_factory.build_index(
+            "flat", dimension, np.empty((0, dimension), dtype=np.float32), faiss.METRIC_INNER_PRODUCT
+        ))
+
+    @classmethod
+    def open(cls, path: str) -> "SessionIndex":
+        """
+        Open a persisted session index. Vector files are mapped read-only,
+        so worker processes share page-cache pages and cold loads do not
+        copy the vectors into the heap
+        """
+        return cls(path)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, CHUNK_STORE_FILE))
+
+    def _read(self, file_name: str):
+        index_file = os.path.join(self.path, file_name)
+        return faiss.read_index(index_file, _mmap_flags(index_file))
+
+    def _write(self, index, file_name: str):
+        """Write atomically so readers that mapped the old file are unaffected, then map the new one"""
+        index_file = os.path.join(self.path, file_name)
+        faiss.write_index(index, index_file + ".tmp")
+        os.replace(index_file + ".tmp", index_file)
+        return self._read(file_name)
+
+    def save(self):
+        """Persist what changed since the last save: a new base or new segments"""
+        if self._base_dirty:
+            self.index = self._write(self.index, self.base_file)
+            self.mmapped = _codes_mapped(self.index)
+            self._base_dirty = False
+
+        for segment in self.segments:
+            if segment["saved"]:
+                continue
+            segment["index"] = self._write(segment["index"], segment["file_name"])
+            self.chunk_store.add_segment(segment["number"], segment["file_name"])
+            segment["saved"] = True
+
+    @property
+    def ntotal(self) -> int:
+        """Stored vectors, including tombstoned ones awaiting compaction"""
+        return self.index.ntotal + sum(s["index"].ntotal for s in self.segments)
+
+    def memory_bytes(self) -> int:
+        """Approximate heap size: ids, plus vector codes unless memory-mapped"""
+        total = self._index_bytes(self.index, self.mmapped)
+        for segment in self.segments:
+            total += self._index_bytes(segment["index"], segment["saved"] and _codes_mapped(segment["index"]))
+        return total
+
+    @staticmethod
+    def _index_bytes(index, mmapped: bool) -> int:
+        if index_factory.is_ivf(index):
+            per_vector = 0 if mmapped else index_factory.code_size(index) + 8
+        else:
+            per_vector = 16 if mmapped else index_factory.code_size(index) + 16
+        return index.ntotal * per_vector
+
+    def chunk_count(self, document_id: str) -> int:
+        """Number of chunks indexed for a document"""
+        doc_number = self.document_numbers.get(document_id)
+        if doc_number is None:
+            return 0
+        return self.chunk_store.chunk_count(doc_number)
+
+    def add_document(
+        self,
+        document_id: str,
+        embeddings: np.ndarray,
+        texts: List[str],
+        metadatas: List[Dict],
+        parents: List[str] = None,
+        append: bool = False
+    ):
+        """
+        Append the chunks of one document to the index
+
+        Args:
+            document_id: Document identifier
+            embeddings: (n, dim) float32 chunk vectors
+            texts: List of text chunks
+            metadatas: List of metadata dicts for each chunk
+            parents: Parent passages of hierarchical chunks; each chunk's
+                     metadata 'parent' is its position in this list
+            append: Add to the document's existing chunks (one batch of a
+                    streamed document) instead of replacing them
+        """
+        if append and document_id in self.document_numbers:
+            doc_number = self.document_numbers[document_id]
+            first_chunk = self.chunk_store.chunk_count(doc_number)
+        else:
+            # Re-uploading under the same id replaces the previous chunks
+            self.remove_document(document_id)
+            doc_number = self.chunk_store.add_document(document_id)
+            self.document_numbers[document_id] = doc_number
+            first_chunk = 0
+
+        if parents:
+            # Positions within the upload become session-wide parent ids
+            parent_ids = self.chunk_store.add_parents(doc_number, parents)
+            metadatas = [
+                {**{k: v for k, v in meta.items() if k != "parent"}, "parent_id": parent_ids[meta["parent"]]}
+                if "parent" in meta else meta
+                for meta in metadatas
+            ]
+
+        ids = (np.int64(doc_number) << DOC_ID_SHIFT) + np.arange(first_chunk, first_chunk + len(texts), dtype=np.int64)
+        embeddings = _normalized(embeddings)
+
+        if self.ntotal == 0:
+            # The first document becomes a flat base: training a compact type here would
+            # hold the session lock, so background compaction retypes it (needs_compaction)
+            self.index = self._build("flat", embeddings, ids)
+            self.mmapped = False
+            self._base_dirty = True
+        else:
+            # Later documents (and later batches of a streamed one) go to a new flat
+            # segment; compaction retypes the merged base
+            self._last_segment += 1
+            self.segments.append({
+                "number": self._last_segment,
+                "file_name": f"segment-{self._last_segment:06d}.faiss",
+                "index": self._build("flat", embeddings, ids),
+                "doc_numbers": {doc_number},
+                "saved": False
+            })
+
+        self.chunk_store.add_chunks(ids.tolist(), doc_number, texts, metadatas)
+        self.lexical_index.add(ids.tolist(), doc_number, texts)
+        self.citation_index.add(ids.tolist(), doc_number, texts)
+
+    @staticmethod
+    def _build(index_type: str, vectors: np.ndarray, ids: np.ndarray):
+        index = index_factory.build_index(
+            index_type, vectors.shape[1], vectors, faiss.METRIC_INNER_PRODUCT, FAISS_IVF_NPROBE
+        )
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        return index
+
+    def remove_document(self, document_id: str) -> bool:
+        """Tombstone all chunks of a document, returns False if it was not indexed"""
+        doc_number = self.document_numbers.pop(document_id, None)
+        if doc_number is None:
+            return False
+
+        self.chunk_store.remove_document(document_id)
+        self.tombstones = self.chunk_store.tombstones()
+        self.lexical_index.remove_document(doc_number)
+        self.citation_index.remove_document(doc_number)
+        return True
+
+    def needs_compaction(self, index_type: str) -> bool:
+        """Whether segments or tombstones should be folded into a new base, or the base retyped"""
+        dead = sum(self.tombstones.values())
+        if len(self.segments) >= FAISS_MAX_SEGMENTS:
+            return True
+        if dead > COMPACTION_DEAD_FRACTION * self.ntotal:
+            return True
+
+        # Grown enough to train a more compact index type
+        target_type = index_factory.resolve_index_type(index_type, self.ntotal - dead)
+        current_type = index_factory.index_type_of(self.index)
+        return index_factory.INDEX_TYPES.index(target_type) > index_factory.INDEX_TYPES.index(current_type)
+
+    def compaction_snapshot(self) -> Dict[str, Any]:
+        """The saved state a compaction folds together; taken under the session lock"""
+        return {
+            "base": self.index,
+            "base_file": self.base_file,
+            "segments": [s for s in self.segments if s["saved"]],
+            "tombstones": dict(self.tombstones)
+        }
+
+    @classmethod
+    def build_compacted(cls, snapshot: Dict[str, Any], index_type: str, original_vectors=None):
+        """
+        Merge a snapshot's base and segments, minus tombstoned documents, into
+        one index of the type the live vector count calls for. Only reads
+        read-only indexes, so it runs without the session lock
+
+        Args:
+            snapshot: From compaction_snapshot()
+            index_type: Requested index type ('auto' selects by live vector count)
+            original_vectors: Optional callable(ids) -> {id: vector} returning the
+                              exact chunk embeddings, so a quantized base is not
+                              retrained on its own lossy reconstructions
+        """
+        indexes = [snapshot["base"]] + [s["index"] for s in snapshot["segments"]]
+        ids, vectors = cls._live_vectors(indexes, snapshot["tombstones"], original_vectors)
+        target_type = index_factory.resolve_index_type(index_type, len(ids))
+        return cls._build(target_type, vectors, ids)
+
+    def install_compacted(self, snapshot: Dict[str, Any], index):
+        """Swap in a compacted base and drop the files it absorbed"""
+        base_file = f"session-{uuid.uuid4().hex[:12]}.faiss"
+        new_base = self._write(index, base_file)
+
+        # One transaction switches the manifest; until then readers see the old files
+        absorbed = [s["number"] for s in snapshot["segments"]]
+        self.chunk_store.commit_compaction(base_file, absorbed, list(snapshot["tombstones"]))
+
+        for file_name in [snapshot["base_file"]] + [s["file_name"] for s in snapshot["segments"]]:
+            try:
+                os.remove(os.path.join(self.path, file_name))
+            except FileNotFoundError:
+                pass
+
+        self.index = new_base
+        self.mmapped = _codes_mapped(new_base)
+        self.base_file = base_file
+        self.segments = [s for s in self.segments if s["number"] not in absorbed]
+        for doc_number in snapshot["tombstones"]:
+            self.tombstones.pop(doc_number, None)
+
+    def live_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, vectors) of every document that has not been removed"""
+        return self._live_vectors([self.index] + [s["index"] for s in self.segments], self.tombstones)
+
+    @staticmethod
+    def _live_vectors(indexes: List[Any], tombstones: Dict[int, int], original_vectors=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and unit vectors of the live documents. Vectors original_vectors
+        cannot supply are decoded from their index (lossy for quantized types)
+        """
+        index_ids = [index_factory.stored_ids(index) for index in indexes]
+        if tombstones:
+            index_ids = [ids[~np.isin(ids >> DOC_ID_SHIFT, list(tombstones))] for ids in index_ids]
+        ids = np.concatenate(index_ids)
+        exact = original_vectors(ids.tolist()) if original_vectors is not None and len(ids) else {}
+
+        parts = []
+        for index, live_ids in zip(indexes, index_ids):
+            rows = [exact.get(i) for i in live_ids.tolist()]
+            rows = [row if row is not None and len(row) == index.d else None for row in rows]
+            if any(row is None for row in rows):
+                decoded_ids, decoded_vectors = index_factory.reconstruct_all(index)
+                decoded = dict(zip(decoded_ids.tolist(), decoded_vectors))
+                rows = [decoded[i] if row is None else row for i, row in zip(live_ids.tolist(), rows)]
+            parts.extend(rows)
+        dimension = indexes[0].d
+        vectors = np.vstack(parts) if parts else np.empty((0, dimension), dtype=np.float32)
+        return ids, _normalized(vectors)
+
+    @staticmethod
+    def _doc_numbers_of(index) -> set:
+        """Document numbers stored in an IDMap2 segment"""
+        ids = faiss.vector_to_array(faiss.downcast_index(index).id_map)
+        return set((ids >> DOC_ID_SHIFT).tolist())
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        document_ids: List[str] = None,
+        filter_dict: Dict = None,
+        query_text: str = None,
+        citations: List[str] = None
+    ) -> List[Dict]:
+        """
+        Search the index, optionally restricted to some documents
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            document_ids: Documents to search (None or empty = all)
+            filter_dict: Metadata filter applied to the hits
+            query_text: Query string; when given, BM25 hits are fused with the dense hits
+            citations: Normalized citation keys from the query; chunks citing them rank first
+
+        Returns:
+            List of dicts with 'chunk_id', 'text', 'metadata' and 'score'
+            (cosine similarity, or fused reciprocal rank score in hybrid mode;
+            citation matches carry their cosine similarity)
+        """
+        if self.ntotal == 0:
+            return []
+
+        doc_numbers = None
+        if document_ids:
+            doc_numbers = [self.document_numbers[d] for d in document_ids if d in self.document_numbers]
+            if not doc_numbers:
+                return []
+            if len(doc_numbers) == len(self.document_numbers):
+                doc_numbers = None
+
+        # Metadata filters are applied after the search, so fetch extra candidates
+        fetch_k = max(top_k * 4, 20) if filter_dict else top_k
+
+        # Chunks citing a section or case named in the query come straight from the
+        # citation postings, ordered among themselves by cosine similarity
+        hits = []
+        cited_ids = self.citation_index.lookup(citations, doc_numbers) if citations else []
+        if cited_ids:
+            hits = self._dense_search(query_embedding, fetch_k, ids=cited_ids)
+
+        # The full search only runs when the citation matches cannot fill the result
+        if len(hits) < fetch_k:
+            if query_text is None:
+                ranked = self._dense_search(query_embedding, fetch_k, doc_numbers)
+            else:
+                # Both rankings go deeper than top_k so fusion can promote lexical-only matches
+                candidate_k = max(fetch_k, top_k * 4)
+                dense_ids = [v for v, _ in self._dense_search(query_embedding, candidate_k, doc_numbers)]
+                lexical_ids = [v for v, _ in self.lexical_index.search(query_text, candidate_k, doc_numbers)]
+                ranked = self._fuse([dense_ids, lexical_ids])
+            seen = {vector_id for vector_id, _ in hits}
+            hits += [hit for hit in ranked if hit[0] not in seen]
+
+        chunks = self.chunk_store.get([vector_id for vector_id, _ in hits])
+
+        results = []
+        for vector_id, score in hits:
+            entry = chunks.get(vector_id)
+            if entry is None:
+                continue
+            if filter_dict and not self._matches(entry["metadata"], filter_dict):
+                continue
+            results.append({
+                "chunk_id": vector_id,
+                "text": entry["text"],
+                "metadata": entry["metadata"],
+                "score": score
+            })
+            if len(results) >= top_k:
+                break
+
+        return results
+
+    def expand_parents(self, results: List[Dict]) -> List[Dict]:
+        """
+        Replace hierarchical chunk hits by their parent passage
+
+        Each parent appears once, at the rank of its best child, with
+        'matched_chunks' counting the children that hit; results of flat
+        chunks pass through unchanged
+
+        Args:
+            results: Results from search()
+
+        Returns:
+            Deduplicated results
+        """
+        parent_ids = [r["metadata"]["parent_id"] for r in results if "parent_id" in r["metadata"]]
+        if not parent_ids:
+            return results
+
+        parents = self.chunk_store.get_parents(list(set(parent_ids)))
+        expanded, by_parent = [], {}
+        for result in results:
+            parent_id = result["metadata"].get("parent_id")
+            if parent_id is None or parent_id not in parents:
+                expanded.append(result)
+            elif parent_id in by_parent:
+                by_parent[parent_id]["matched_chunks"] += 1
+            else:
+                by_parent[parent_id] = {**result, "text": parents[parent_id], "matched_chunks": 1}
+                expanded.append(by_parent[parent_id])
+        return expanded
+
+    def _dense_search(
+        self,
+        query_embedding: List[float],
+        k: int,
+        doc_numbers: List[int] = None,
+        ids: List[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        FAISS search over the base and every segment -> [(vector_id, cosine similarity)],
+        filtered to doc_numbers or explicit ids by id selector
+        """
+        query = _normalized(query_embedding)
+
+        # Keep the selector objects referenced until the searches return
+        selectors = self._selectors(doc_numbers, ids)
+        selector = selectors[-1] if selectors else None
+
+        if ids is not None:
+            wanted = {int(vector_id) >> DOC_ID_SHIFT for vector_id in ids}
+        else:
+            wanted = set(doc_numbers) if doc_numbers is not None else set(self.document_numbers.values())
+
+        # Segments holding none of the wanted documents are never searched
+        rankings = (
+            self._search_index(index, query, k, selector)
+            for index in [self.index] + [s["index"] for s in self.segments if s["doc_numbers"] & wanted]
+        )
+        return merge_top_k(rankings, k)
+
+    def _selectors(self, doc_numbers: List[int] = None, ids: List[int] = None) -> List[Any]:
+        """Id selectors for a search, the last element is the one to apply"""
+        if ids is not None:
+            return [faiss.IDSelectorBatch(np.asarray(ids, dtype=np.int64))]
+        if doc_numbers is not None:
+            return self._document_selectors(doc_numbers)
+        if not self.tombstones:
+            return []
+
+        # Hide removed documents until compaction drops their vectors
+        live = list(self.document_numbers.values())
+        if len(live) <= len(self.tombstones):
+            return self._document_selectors(live)
+        selectors = self._document_selectors(sorted(self.tombstones))
+        selectors.append(faiss.IDSelectorNot(selectors[-1]))
+        return selectors
+
+    @staticmethod
+    def _search_index(index, query: np.ndarray, k: int, selector=None) -> List[Tuple[int, float]]:
+        k = min(k, index.ntotal)
+        if k == 0:
+            return []
+
+        params = None
+        if selector is not None:
+            if index_factory.is_ivf(index):
+                nprobe = faiss.extract_index_ivf(index).nprobe
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+            else:
+                params = faiss.SearchParameters(sel=selector)
+
+        scores, ids = index.search(query, k, params=params)
+        return [(int(v), float(s)) for s, v in zip(scores[0], ids[0]) if v >= 0]
+
+    @staticmethod
+    def _fuse(rankings: List[List[int]]) -> List[Tuple[int, float]]:
+        """Reciprocal rank fusion of several rankings -> [(vector_id, score)], best first"""
+        scores = {}
+        for ranking in rankings:
+            for rank, vector_id in enumerate(ranking):
+                scores[vector_id] = scores.get(vector_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _document_selectors(self, doc_numbers: List[int]) -> List[Any]:
+        """Build an OR-chain of id-range selectors, the last element selects all documents"""
+        selectors = []
+        combined = None
+        for doc_number in doc_numbers:
+            selector = faiss.IDSelectorRange(*self._id_range(doc_number))
+            selectors.append(selector)
+            if combined is not None:
+                combined = faiss.IDSelectorOr(combined, selector)
+                selectors.append(combined)
+            else:
+                combined = selector
+        return selectors
+
+    @staticmethod
+    def _id_range(doc_number: int):
+        return doc_number << DOC_ID_SHIFT, (doc_number + 1) << DOC_ID_SHIFT
+
+    @staticmethod
+    def _matches(metadata: Dict, filter_dict: Dict) -> bool:
+        for key, value in filter_dict.items():
+            if isinstance(value, list):
+                if metadata.get(key) not in value:
+                    return False
+            elif metadata.get(key) != value:
+                return False
+        return True
 
 
 class FAISSVectorStore:
@@ -13,53 +667,175 @@ class FAISSVectorStore:
     Replaces Pinecone for demo/local usage
     """
 
-    def __init__(self, persist_directory: str = "faiss_indexes"):
+    def __init__(
+        self,
+        persist_directory: str = FAISS_INDEX_DIR,
+        query_cache_size: int = 1024,
+        memory_budget_bytes: int = FAISS_MEMORY_BUDGET_MB * 1024 * 1024,
+        index_ttl_seconds: float = FAISS_INDEX_TTL_SECONDS,
+        index_type: str = FAISS_INDEX_TYPE,
+        retrieval_mode: str = RETRIEVAL_MODE,
+        query_workers: int = VECTOR_STORE_QUERY_WORKERS,
+        ingest_workers: int = VECTOR_STORE_INGEST_WORKERS
+    ):
         self.persist_directory = persist_directory
+        self.index_type = index_type  # flat, fp16, sq8, ivf, ivfpq or auto
+        self.retrieval_mode = retrieval_mode  # dense or hybrid (dense + BM25)
         os.makedirs(persist_directory, exist_ok=True)
 
         # Lazy load embeddings to avoid startup issues
         self._embeddings = None
+        self._lock = threading.Lock()
 
-        self.vector_stores = {}  # session_id -> FAISS index
+        # Blocking FAISS/embedding work runs in these pools, never on the event loop.
+        # Ingestion has its own pool so a large upload cannot starve chat queries
+        self.query_executor = InstrumentedExecutor("faiss-query", query_workers)
+        self.ingest_executor = InstrumentedExecutor("faiss-ingest", ingest_workers)
+
+        # session_id -> lock serializing mutations of that session's index with its searches
+        self._session_locks = {}
+
+        # Segment/tombstone compaction runs in the background, one session at a time
+        self._compaction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="faiss-compact")
+        self._compaction_pending = set()
+        self._compacting = set()  # sessions whose merge is being built, by any caller
+        self.compactions = 0
+
+        # session_id -> SessionIndex, bounded by memory budget; evicted indexes reload from disk
+        self.vector_stores = IndexResidencyManager(memory_budget_bytes, index_ttl_seconds)
+
+        # Query text -> embedding vector (LRU), plus pinned fixed queries that are never evicted
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._pinned_queries = {}
+
+        # Session -> documents -> index path, so queries never scan the directory
+        self.catalog = IndexCatalog(os.path.join(persist_directory, CATALOG_FILE))
+        if self.catalog.created:
+            self._backfill_catalog()
+
+        # Chunk vectors shared across sessions, keyed by model and chunk text hash
+        self.embedding_cache = EmbeddingCache(os.path.join(persist_directory, EMBEDDING_CACHE_FILE))
 
     @property
     def embeddings(self):
-        """Lazy load embeddings only when needed"""
+        """Configured embedding backend; the model itself loads on first use"""
         if self._embeddings is None:
-            self._embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-mpnet-base-v2"
-            )
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = get_embedding_backend()
         return self._embeddings
 
-    def create_index(self, documents: List[str], metadatas: List[Dict], session_id: str, document_id: str = None):
+    def pin_query(self, query_text: str):
+        """
+        Register a fixed query string (e.g. a hard-coded probe) whose vector
+        is kept for the process lifetime instead of competing in the LRU cache.
+        The vector itself is computed lazily on first use.
+        """
+        key = query_text.strip()
+        with self._lock:
+            self._pinned_queries.setdefault(key, None)
+
+    def embed_query(self, query_text: str) -> List[float]:
         """
-        Create FAISS index from documents and metadata
+        Embed a query string, reusing cached vectors where possible
+
+        Args:
+            query_text: Query string
+
+        Returns:
+            Query embedding vector
+        """
+        key = query_text.strip()
+
+        with self._lock:
+            pinned = key in self._pinned_queries
+            vector = self._pinned_queries.get(key) if pinned else self._query_cache.get(key)
+            if vector is not None:
+                if not pinned:
+                    self._query_cache.move_to_end(key)
+                return vector
+
+        # Embed outside the lock; concurrent misses for one key just compute it twice
+        vector = self.embeddings.embed_query(key)
+
+        with self._lock:
+            if pinned:
+                self._pinned_queries[key] = vector
+            else:
+                self._query_cache[key] = vector
+                if len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return vector
+
+    def embed_documents(self, documents: List[str]) -> np.ndarray:
+        """Embed chunks; only chunks never seen before (in any session) go through the model"""
+        return self.embedding_cache.embed_documents(self.embeddings, self.embeddings.cache_key, documents)
+
+    def create_index(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        session_id: str,
+        document_id: str = None,
+        parents: List[str] = None,
+        append: bool = False,
+        embeddings: np.ndarray = None,
+        defer_compaction: bool = False
+    ):
+        """
+        Add a document's chunks to the session's FAISS index
 
         Args:
             documents: List of text chunks
             metadatas: List of metadata dicts for each chunk
             session_id: Unique session identifier
             document_id: Unique document identifier (for multi-doc support)
+            parents: Parent passages of hierarchical chunks (see DocumentProcessor.hierarchical_chunking);
+                     only the chunks are embedded
+            append: Add to the document's chunks from earlier calls instead of replacing
+                    them (used by the streaming ingestion pipeline, one call per batch)
+            embeddings: Vectors of the chunks from embed_documents (computed here if None)
+            defer_compaction: Do not schedule a compaction; the caller adds more batches
+                              and calls schedule_compaction after the last one
         """
-        # Convert to LangChain Document objects
-        docs = [
-            Document(page_content=text, metadata=meta)
-            for text, meta in zip(documents, metadatas)
-        ]
+        if not documents:
+            return self.vector_stores.get(session_id)
+
+        if embeddings is None:
+            embeddings = self.embed_documents(documents)
+
+        index_path = self._index_path(session_id)
+        doc_key = document_id or session_id
+        with self._session_lock(session_id):
+            session_index = self._get_session_index(session_id, index_path)
+            if session_index is None:
+                session_index = SessionIndex.create(embeddings.shape[1], index_path)
 
-        # Create unique key for this document
-        index_key = f"{session_id}_{document_id}" if document_id else session_id
+            session_index.add_document(doc_key, embeddings, documents, metadatas, parents, append)
 
-        # Create FAISS index
-        vector_store = FAISS.from_documents(docs, self.embeddings)
+            # Persist only the new segment, then (re)admit with its new size
+            session_index.save()
+            self.vector_stores.put(session_id, session_index, session_index.memory_bytes())
+            self.catalog.register_document(
+                session_id,
+                session_index.path,
+                doc_key,
+                session_index.document_numbers[doc_key],
+                session_index.chunk_count(doc_key)
+            )
 
-        # Store in memory
-        self.vector_stores[index_key] = vector_store
+            if not defer_compaction and session_index.needs_compaction(self.index_type):
+                self._schedule_compaction(session_id)
 
-        # Persist to disk
-        self._save_index(index_key)
+        return session_index
 
-        return vector_store
+    def schedule_compaction(self, session_id: str):
+        """Compact in the background if the session has reached the thresholds (e.g. after deferred batches)"""
+        with self._session_lock(session_id):
+            session_index = self.vector_stores.get(session_id)
+            if session_index is not None and session_index.needs_compaction(self.index_type):
+                self._schedule_compaction(session_id)
 
     def query(
         self,
@@ -67,7 +843,9 @@ class FAISSVectorStore:
         query_text: str,
         top_k: int = 5,
         filter_dict: Dict = None,
-        document_ids: List[str] = None
+        document_ids: List[str] = None,
+        mode: str = None,
+        expand_parents: bool = True
     ) -> List[Dict]:
         """
         Query FAISS index for similar documents
@@ -77,114 +855,347 @@ class FAISSVectorStore:
             query_text: Query string
             top_k: Number of results to return
             filter_dict: Metadata filter
-            document_ids: List of document IDs to search (None = all docs in session)
+            document_ids: List of document IDs to search (None or empty = all docs in session)
+            mode: 'dense' or 'hybrid' (dense + BM25 fused by reciprocal rank); default from config
+            expand_parents: Return the parent passage of hierarchical chunk hits, once per
+                            parent (so possibly fewer than top_k results)
 
         Returns:
             List of dicts with 'text' and 'metadata'
         """
-        all_results = []
-        
-        # If document_ids specified, search only those
-        if document_ids:
-            index_keys = [f"{session_id}_{doc_id}" for doc_id in document_ids]
-        else:
-            # Search all documents in session
-            index_keys = [key for key in self.vector_stores.keys() if key.startswith(f"{session_id}_")]
-            # Also try to load from disk
-            import os
-            for item in os.listdir(self.persist_directory):
-                if item.startswith(f"{session_id}_") and os.path.isdir(os.path.join(self.persist_directory, item)):
-                    if item not in self.vector_stores:
-                        self._load_index(item)
-                        if item in self.vector_stores:
-                            index_keys.append(item)
-        
-        # Query each index
-        for index_key in index_keys:
-            if index_key not in self.vector_stores:
-                self._load_index(index_key)
-            
-            if index_key not in self.vector_stores:
-                continue
+        mode = mode or self.retrieval_mode
+        if mode not in ("dense", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {mode}. Supported: dense, hybrid")
 
-            vector_store = self.vector_stores[index_key]
+        with self._session_lock(session_id):
+            session_index = self.vector_stores.get(session_id)
+            if session_index is None:
+                # Resolve through the catalog; sessions without documents cost one lookup
+                entry = self.catalog.get_session(session_id)
+                if entry is None or not entry["documents"]:
+                    return []
+                if document_ids and not any(d in entry["documents"] for d in document_ids):
+                    return []
+                session_index = self._load_index(session_id, entry["index_path"])
 
-            # Perform similarity search
-            if filter_dict:
-                results = vector_store.similarity_search_with_score(
-                    query_text,
-                    k=top_k,
-                    filter=filter_dict
-                )
-            else:
-                results = vector_store.similarity_search_with_score(
-                    query_text,
-                    k=top_k
-                )
+        if session_index is None:
+            return []
 
-            # Format results
-            for doc, score in results:
-                all_results.append({
-                    "text": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": float(score)
-                })
-        
-        # Sort by score and return top_k
-        all_results.sort(key=lambda x: x["score"])
-        return all_results[:top_k]
+        query_embedding = self.embed_query(query_text)
+        with self._session_lock(session_id):
+            results = session_index.search(
+                query_embedding,
+                top_k,
+                document_ids=document_ids,
+                filter_dict=filter_dict,
+                query_text=query_text if mode == "hybrid" else None,
+                citations=extract_citations(query_text)
+            )
+            return session_index.expand_parents(results) if expand_parents else results
+
+    def expand_parents(self, session_id: str, results: List[Dict]) -> List[Dict]:
+        """Expand hierarchical chunk hits to their parents, e.g. after reranking the chunks"""
+        with self._session_lock(session_id):
+            session_index = self.vector_stores.get(session_id)
+            if session_index is None:
+                entry = self.catalog.get_session(session_id)
+                if entry is None:
+                    return results
+                session_index = self._load_index(session_id, entry["index_path"])
+            if session_index is None:
+                return results
+            return session_index.expand_parents(results)
 
     def delete_index(self, session_id: str, document_id: str = None):
-        """Delete index from memory and disk"""
-        if document_id:
-            # Delete specific document
-            index_key = f"{session_id}_{document_id}"
-            if index_key in self.vector_stores:
-                del self.vector_stores[index_key]
-            
-            # Delete from disk
-            index_path = os.path.join(self.persist_directory, index_key)
-            if os.path.exists(index_path):
-                import shutil
+        """Delete a document (or the whole session index) from memory and disk"""
+        entry = self.catalog.get_session(session_id)
+        index_path = entry["index_path"] if entry else self._index_path(session_id)
+
+        with self._session_lock(session_id):
+            if document_id:
+                session_index = self._get_session_index(session_id, index_path)
+                if session_index is None or document_id not in session_index.document_numbers:
+                    return
+                # Only a tombstone is written; the vectors go at the next compaction
+                session_index.remove_document(document_id)
+
+                self.catalog.remove_document(session_id, document_id)
+                if session_index.document_numbers:
+                    self.catalog.refresh_files(session_id, index_path)
+                    if session_index.needs_compaction(self.index_type):
+                        self._schedule_compaction(session_id)
+                    return
+
+            # Delete the whole session index
+            self.vector_stores.pop(session_id, None)
+            self.catalog.remove_session(session_id)
+            if os.path.isdir(index_path):
                 shutil.rmtree(index_path)
-        else:
-            # Delete all documents in session
-            keys_to_delete = [key for key in self.vector_stores.keys() if key.startswith(f"{session_id}_")]
-            for key in keys_to_delete:
-                del self.vector_stores[key]
-            
-            # Delete from disk
-            import shutil
-            for item in os.listdir(self.persist_directory):
-                if item.startswith(f"{session_id}_"):
-                    item_path = os.path.join(self.persist_directory, item)
-                    if os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-
-    def _save_index(self, session_id: str):
-        """Save FAISS index to disk"""
-        if session_id not in self.vector_stores:
-            return
-
-        save_path = os.path.join(self.persist_directory, session_id)
-        self.vector_stores[session_id].save_local(save_path)
-
-    def _load_index(self, session_id: str):
-        """Load FAISS index from disk"""
-        load_path = os.path.join(self.persist_directory, session_id)
-
-        if not os.path.exists(f"{load_path}/index.faiss"):
-            return
 
+    def compact(self, session_id: str, force: bool = False) -> bool:
+        """
+        Fold a session's segments and tombstones into a new base index
+
+        The merged index is built outside the session lock from read-only
+        snapshots, so searches and uploads continue meanwhile; only the final
+        swap is serialized with them
+
+        Args:
+            session_id: Session identifier
+            force: Compact even if below the segment/tombstone thresholds
+
+        Returns:
+            True if the session was compacted (False also when another
+            compaction of the session is already running)
+        """
+        with self._lock:
+            if session_id in self._compacting:
+                return False
+            self._compacting.add(session_id)
         try:
-            vector_store = FAISS.load_local(
-                load_path,
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            self.vector_stores[session_id] = vector_store
+            return self._compact(session_id, force)
+        finally:
+            with self._lock:
+                self._compacting.discard(session_id)
+
+    def _compact(self, session_id: str, force: bool) -> bool:
+        lock = self._session_lock(session_id)
+        with lock:
+            session_index = self._get_session_index(session_id)
+            if session_index is None:
+                return False
+            foldable = session_index.segments or session_index.tombstones
+            if not session_index.needs_compaction(self.index_type) and not (force and foldable):
+                return False
+            snapshot = session_index.compaction_snapshot()
+
+        compacted = SessionIndex.build_compacted(snapshot, self.index_type, self._original_vectors(session_index))
+
+        with lock:
+            # Install only into the live object: if the session was deleted (and maybe
+            # recreated under the same id) or evicted meanwhile, its files are not ours
+            if self.vector_stores.get(session_id) is not session_index:
+                return False
+            session_index.install_compacted(snapshot, compacted)
+            self.vector_stores.put(session_id, session_index, session_index.memory_bytes())
+            self.catalog.refresh_files(session_id, session_index.path)
+        self.compactions += 1
+        print(f"[FAISS] Compacted {session_id}: {compacted.ntotal} vectors, {len(session_index.segments)} segments left")
+        return True
+
+    def vacuum(self, session_id: str) -> int:
+        """
+        Rebuild a session's SQLite files that have free pages left by deletions
+
+        Returns:
+            Bytes reclaimed
+        """
+        entry = self.catalog.get_session(session_id)
+        index_path = entry["index_path"] if entry else self._index_path(session_id)
+
+        reclaimed = 0
+        with self._session_lock(session_id):
+            for file_name in (CHUNK_STORE_FILE, LEXICAL_INDEX_FILE, CITATION_INDEX_FILE):
+                db_path = os.path.join(index_path, file_name)
+                if not os.path.exists(db_path):
+                    continue
+                conn = sqlite3.connect(db_path)
+                try:
+                    if conn.execute("PRAGMA freelist_count").fetchone()[0] == 0:
+                        continue
+                    size = os.path.getsize(db_path)
+                    conn.execute("VACUUM")
+                finally:
+                    conn.close()
+                reclaimed += max(size - os.path.getsize(db_path), 0)
+        return reclaimed
+
+    def _original_vectors(self, session_index: SessionIndex):
+        """Lookup of exact chunk embeddings by vector id: chunk text from the chunk store, vector from the embedding cache"""
+        model = self.embeddings.cache_key
+
+        def lookup(vector_ids: List[int]) -> Dict[int, np.ndarray]:
+            found = {}
+            for start in range(0, len(vector_ids), 500):
+                chunks = session_index.chunk_store.get(vector_ids[start:start + 500])
+                hashes = {vector_id: chunk_hash(entry["text"]) for vector_id, entry in chunks.items()}
+                cached = self.embedding_cache.get_many(model, list(hashes.values()))
+                found.update((vector_id, cached[h]) for vector_id, h in hashes.items() if h in cached)
+            return found
+
+        return lookup
+
+    def compaction_in_progress(self, session_id: str) -> bool:
+        """Whether a compaction of the session is queued or running"""
+        with self._lock:
+            return session_id in self._compaction_pending or session_id in self._compacting
+
+    def _schedule_compaction(self, session_id: str):
+        with self._lock:
+            if session_id in self._compaction_pending:
+                return
+            self._compaction_pending.add(session_id)
+        self._compaction_executor.submit(self._run_compaction, session_id)
+
+    def _run_compaction(self, session_id: str):
+        try:
+            self.compact(session_id)
+        except Exception as e:
+            print(f"[FAISS] Compaction of {session_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._compaction_pending.discard(session_id)
+
+    async def aquery(
+        self,
+        session_id: str,
+        query_text: str,
+        top_k: int = 5,
+        filter_dict: Dict = None,
+        document_ids: List[str] = None,
+        mode: str = None,
+        expand_parents: bool = True
+    ) -> List[Dict]:
+        """query on the query pool, so searches never block the event loop"""
+        return await self.query_executor.run(
+            self.query, session_id, query_text, top_k, filter_dict, document_ids, mode, expand_parents
+        )
+
+    async def adelete_index(self, session_id: str, document_id: str = None):
+        """delete_index on the ingest pool"""
+        return await self.ingest_executor.run(self.delete_index, session_id, document_id)
+
+    def index_type_report(
+        self,
+        session_id: str,
+        k: int = 10,
+        num_queries: int = 100,
+        include_ivfpq: bool = False
+    ) -> List[Dict]:
+        """
+        Recall/latency of every index type on a session's own vectors,
+        using a sample of its chunks as queries
+
+        Args:
+            session_id: Session identifier
+            k: Neighbours compared for recall@k
+            num_queries: Number of sampled query vectors
+            include_ivfpq: Also train IVF-PQ, which takes minutes on large sessions
+
+        Returns:
+            One report row per index type (see index_factory.evaluate_index_types)
+        """
+        session_index = self._get_session_index(session_id)
+        if session_index is None or session_index.ntotal == 0:
+            return []
+
+        _, vectors = session_index.live_vectors()
+        if len(vectors) == 0:
+            return []
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)]
+        index_types = [
+            t for t in index_factory.INDEX_TYPES
+            if (include_ivfpq or t != "ivfpq") and len(vectors) >= index_factory.min_training_vectors(t)
+        ]
+        return index_factory.evaluate_index_types(
+            vectors, queries, k=k, index_types=index_types, metric=faiss.METRIC_INNER_PRODUCT
+        )
+
+    def residency_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the loaded-index cache"""
+        return self.vector_stores.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for the debug endpoint"""
+        return {
+            "residency": self.residency_stats(),
+            "embedding_cache": self.embedding_cache.stats(),
+            "query_cache": {"entries": len(self._query_cache), "pinned": len(self._pinned_queries)},
+            "executors": {
+                "query": self.query_executor.stats(),
+                "ingest": self.ingest_executor.stats()
+            },
+            "compaction": {"completed": self.compactions, "pending": len(self._compaction_pending)}
+        }
+
+    def _session_lock(self, session_id: str) -> threading.RLock:
+        with self._lock:
+            return self._session_locks.setdefault(session_id, threading.RLock())
+
+    def _index_path(self, session_id: str) -> str:
+        return os.path.join(self.persist_directory, session_id)
+
+    def _get_session_index(self, session_id: str, load_path: str = None):
+        """Resident session index, reloading it from disk if it was evicted"""
+        session_index = self.vector_stores.get(session_id)
+        if session_index is None:
+            session_index = self._load_index(session_id, load_path)
+        return session_index
+
+    def _load_index(self, session_id: str, load_path: str = None, resident: bool = True):
+        """Memory-map a FAISS index from disk; chunks are read lazily from its chunk store"""
+        load_path = load_path or self._index_path(session_id)
+
+        if not SessionIndex.exists(load_path):
+            return None
+
+        try:
+            session_index = SessionIndex.open(load_path)
         except Exception as e:
             print(f"Error loading index {session_id}: {e}")
+            return None
+
+        if resident:
+            self.vector_stores.put(session_id, session_index, session_index.memory_bytes())
+        return session_index
+
+    def _backfill_catalog(self):
+        """One-time import of session indexes persisted before the catalog existed"""
+        for entry in os.scandir(self.persist_directory):
+            if not entry.is_dir() or not SessionIndex.exists(entry.path):
+                continue
+
+            session_index = self._load_index(entry.name, entry.path, resident=False)
+            if session_index is None:
+                continue
+
+            for doc_key, doc_number in session_index.document_numbers.items():
+                self.catalog.register_document(
+                    entry.name, entry.path, doc_key, doc_number, session_index.chunk_count(doc_key)
+                )
+            print(f"[CATALOG] Imported session index {entry.name}")
+
+    def legacy_indexes(self) -> Dict[str, str]:
+        """Directory name -> path of every per-document index still in the pre-session layout"""
+        return {
+            entry.name: entry.path
+            for entry in os.scandir(self.persist_directory)
+            if entry.is_dir() and is_legacy_index(entry.path) and not SessionIndex.exists(entry.path)
+        }
+
+    def migrate_legacy_index(self, path: str, session_id: str, document_id: str) -> int:
+        """
+        Move a per-document LangChain index into its session index, then delete it
+
+        The stored vectors are kept when the configured backend is the model
+        they were embedded with (and seed the embedding cache); otherwise the
+        texts are re-embedded with the configured backend
+
+        Returns:
+            Number of chunks migrated
+        """
+        texts, metadatas, vectors = read_legacy_index(path)
+        if texts:
+            if self.embeddings.cache_key == LEGACY_EMBEDDING_MODEL:
+                self.embedding_cache.put_many(LEGACY_EMBEDDING_MODEL, [chunk_hash(t) for t in texts], vectors)
+                embeddings = vectors
+            else:
+                embeddings = self.embed_documents(texts)
+            self.create_index(texts, metadatas, session_id, document_id, embeddings=embeddings)
+        shutil.rmtree(path)
+        print(f"[FAISS] Migrated legacy index {os.path.basename(path)}: {len(texts)} chunks")
+        return len(texts)
 
     def get_embedding_dimension(self) -> int:
         """Get embedding dimension"""
@@ -3,9 +3,10 @@ import pickle
 from typing import List, Dict, Any
 import numpy as np
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import FakeEmbeddings
 from langchain.docstore.document import Document
 
+from app.services.embedding_backends import HashingBackend, LangChainEmbeddings
+
 
 class FAISSVectorStore:
     """
@@ -17,7 +18,7 @@ class FAISSVectorStore:
         self.persist_directory = persist_directory
         os.makedirs(persist_directory, exist_ok=True)
 
-        # Use fake embeddings for now (simple, no dependencies)
+        # Deterministic hashing embeddings (no model, no torch)
         self._embeddings = None
 
         self.vector_stores = {}  # session_id -> FAISS index
@@ -26,9 +27,8 @@ class FAISSVectorStore:
     def embeddings(self):
         """Use simple embeddings to avoid torch conflicts"""
         if self._embeddings is None:
-            # Use FakeEmbeddings (random vectors) for testing
-            # This works but isn't production-ready
-            self._embeddings = FakeEmbeddings(size=768)
+            # Feature hashing: reproducible lexical-overlap retrieval, unlike random vectors
+            self._embeddings = LangChainEmbeddings(HashingBackend(768))
         return self._embeddings
 
     def create_index(self, documents: List[str], metadatas: List[Dict], session_id: str):
@@ -136,7 +136,7 @@ class FAISSVectorStore:
 
     def get_embedding_dimension(self) -> int:
         """Get embedding dimension"""
-        return 768  # FakeEmbeddings dimension
+        return self.embeddings.backend.dimension
 
 
 # Global instance
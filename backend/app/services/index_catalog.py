@@ -0,0 +1,158 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.db.database import connect
+
+
+class IndexCatalog:
+    """
+    Persisted catalog of session indexes (SQLite)
+    Maps session -> documents -> index path, with file metadata, so queries
+    resolve their index set without scanning the index directory
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # True when the catalog file did not exist yet, so the owner can backfill it
+        self.created = not os.path.exists(db_path)
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS index_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    index_path TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS index_documents (
+                    session_id TEXT NOT NULL,
+                    document_id TEXT NOT NULL,
+                    document_number INTEGER NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, document_id)
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS index_files (
+                    session_id TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    modified_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (session_id, file_name)
+                )
+            """)
+            conn.commit()
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """
+        Look up a session's index
+
+        Returns:
+            Dict with 'index_path', 'documents' (document_id -> info) and 'files',
+            or None if the session has no index
+        """
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT index_path, updated_at FROM index_sessions WHERE session_id = ?", (session_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            cursor.execute(
+                "SELECT document_id, document_number, chunk_count, created_at FROM index_documents WHERE session_id = ?",
+                (session_id,)
+            )
+            documents = {
+                r["document_id"]: {
+                    "document_number": r["document_number"],
+                    "chunk_count": r["chunk_count"],
+                    "created_at": r["created_at"]
+                }
+                for r in cursor.fetchall()
+            }
+
+            cursor.execute(
+                "SELECT file_name, size_bytes, modified_at FROM index_files WHERE session_id = ?",
+                (session_id,)
+            )
+            files = {
+                r["file_name"]: {"size_bytes": r["size_bytes"], "modified_at": r["modified_at"]}
+                for r in cursor.fetchall()
+            }
+
+        return {
+            "index_path": row["index_path"],
+            "updated_at": row["updated_at"],
+            "documents": documents,
+            "files": files
+        }
+
+    def list_sessions(self) -> List[str]:
+        """All session ids that have an index"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT session_id FROM index_sessions")
+            return [r["session_id"] for r in cursor.fetchall()]
+
+    def register_document(self, session_id: str, index_path: str, document_id: str, document_number: int, chunk_count: int):
+        """Record a document as indexed in the session's index"""
+        now = datetime.now().isoformat()
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO index_sessions (session_id, index_path, updated_at) VALUES (?, ?, ?)",
+                (session_id, index_path, now)
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO index_documents (session_id, document_id, document_number, chunk_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, document_id, document_number, chunk_count, now)
+            )
+            conn.commit()
+        self.refresh_files(session_id, index_path)
+
+    def remove_document(self, session_id: str, document_id: str):
+        """Drop a document from the session's entry"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM index_documents WHERE session_id = ? AND document_id = ?",
+                (session_id, document_id)
+            )
+            cursor.execute(
+                "UPDATE index_sessions SET updated_at = ? WHERE session_id = ?",
+                (datetime.now().isoformat(), session_id)
+            )
+            conn.commit()
+
+    def remove_session(self, session_id: str):
+        """Drop a session and everything recorded for it"""
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM index_files WHERE session_id = ?", (session_id,))
+            cursor.execute("DELETE FROM index_documents WHERE session_id = ?", (session_id,))
+            cursor.execute("DELETE FROM index_sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+    def refresh_files(self, session_id: str, index_path: str):
+        """Record size and modification time of the files in a session's index directory"""
+        if not os.path.isdir(index_path):
+            return
+
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM index_files WHERE session_id = ?", (session_id,))
+            for entry in os.scandir(index_path):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                cursor.execute(
+                    "INSERT INTO index_files (session_id, file_name, size_bytes, modified_at) VALUES (?, ?, ?, ?)",
+                    (session_id, entry.name, stat.st_size, datetime.fromtimestamp(stat.st_mtime).isoformat())
+                )
+            conn.commit()
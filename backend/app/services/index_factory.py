@@ -0,0 +1,210 @@
+import math
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+import faiss
+
+# Index types in order of increasing compression; "auto" picks one by vector count
+INDEX_TYPES = ["flat", "fp16", "sq8", "ivf", "ivfpq"]
+
+# Auto-selection thresholds (vectors per session index)
+AUTO_FLAT_MAX_VECTORS = 20_000
+AUTO_SQ8_MAX_VECTORS = 100_000
+
+# k-means wants ~39 training points per centroid
+TRAINING_POINTS_PER_CENTROID = 39
+MIN_IVF_LISTS = 16
+PQ_BITS = 8
+
+
+def select_index_type(n_vectors: int) -> str:
+    """Automatic index type for a session index holding n_vectors"""
+    if n_vectors < AUTO_FLAT_MAX_VECTORS:
+        return "flat"
+    if n_vectors < AUTO_SQ8_MAX_VECTORS:
+        return "sq8"
+    return "ivfpq"
+
+
+def resolve_index_type(requested: str, n_vectors: int) -> str:
+    """
+    Index type to build for n_vectors. Falls back to flat while there are
+    too few vectors to train the requested quantizer
+    """
+    index_type = select_index_type(n_vectors) if requested == "auto" else requested
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {requested}. Supported: {INDEX_TYPES + ['auto']}")
+    if n_vectors < min_training_vectors(index_type):
+        return "flat"
+    return index_type
+
+
+def min_training_vectors(index_type: str) -> int:
+    if index_type == "ivf":
+        return MIN_IVF_LISTS * TRAINING_POINTS_PER_CENTROID
+    if index_type == "ivfpq":
+        return (2 ** PQ_BITS) * TRAINING_POINTS_PER_CENTROID
+    return 0
+
+
+def factory_string(index_type: str, dimension: int, n_vectors: int) -> str:
+    """faiss.index_factory description for an index type"""
+    if index_type == "flat":
+        return "IDMap2,Flat"
+    if index_type == "fp16":
+        return "IDMap2,SQfp16"
+    if index_type == "sq8":
+        return "IDMap2,SQ8"
+
+    # IVF indexes take ids natively; IDMap2 would break on remove_ids
+    nlist = max(MIN_IVF_LISTS, int(4 * math.sqrt(n_vectors)))
+    nlist = max(MIN_IVF_LISTS, min(nlist, n_vectors // TRAINING_POINTS_PER_CENTROID))
+    if index_type == "ivf":
+        return f"IVF{nlist},Flat"
+
+    # Sub-quantizers of 8 dims each, e.g. 96 bytes per 768-dim vector
+    m = next(m for m in range(max(dimension // 8, 1), 0, -1) if dimension % m == 0)
+    return f"IVF{nlist},PQ{m}x{PQ_BITS}"
+
+
+def build_index(index_type: str, dimension: int, training_vectors: np.ndarray, metric: int = faiss.METRIC_L2, nprobe: int = 16):
+    """
+    Create an empty id-addressable index, trained on training_vectors if the type needs it
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Vector dimension
+        training_vectors: (n, dim) float32 sample used for training
+        metric: faiss metric
+        nprobe: Inverted lists visited per search (IVF types)
+    """
+    index = faiss.index_factory(dimension, factory_string(index_type, dimension, len(training_vectors)), metric)
+    if not index.is_trained:
+        index.train(training_vectors)
+    if index_type in ("ivf", "ivfpq"):
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    return index
+
+
+def index_type_of(index) -> str:
+    """Inverse of factory_string for a built index"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    sub_index = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    if isinstance(sub_index, faiss.IndexScalarQuantizer):
+        return "fp16" if sub_index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    return "flat"
+
+
+def is_ivf(index) -> bool:
+    return isinstance(faiss.downcast_index(index), faiss.IndexIVF)
+
+
+def code_size(index) -> int:
+    """Bytes stored per vector"""
+    index = faiss.downcast_index(index)
+    if hasattr(index, "id_map"):
+        index = faiss.downcast_index(index.index)
+    return getattr(index, "code_size", index.d * 4)
+
+
+def stored_ids(index) -> np.ndarray:
+    """Ids of every stored vector, in reconstruct_all order, without decoding any vector"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        ids = [
+            faiss.rev_swig_ptr(index.invlists.get_ids(list_no), index.invlists.list_size(list_no)).copy()
+            for list_no in range(index.nlist)
+            if index.invlists.list_size(list_no)
+        ]
+        return np.concatenate(ids).astype(np.int64) if ids else np.empty(0, dtype=np.int64)
+    return faiss.vector_to_array(index.id_map).astype(np.int64)
+
+
+def reconstruct_all(index) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode every stored vector (exact for flat, approximate for quantized types)
+
+    Returns:
+        Tuple of (ids, vectors)
+    """
+    index = faiss.downcast_index(index)
+    if index.ntotal == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, index.d), dtype=np.float32)
+
+    if isinstance(index, faiss.IndexIVF):
+        ids, vectors = [], []
+        buffer = np.empty(index.d, dtype=np.float32)
+        for list_no in range(index.nlist):
+            list_size = index.invlists.list_size(list_no)
+            if list_size == 0:
+                continue
+            ids.append(faiss.rev_swig_ptr(index.invlists.get_ids(list_no), list_size).copy())
+            for offset in range(list_size):
+                index.reconstruct_from_offset(list_no, offset, faiss.swig_ptr(buffer))
+                vectors.append(buffer.copy())
+        return np.concatenate(ids), np.vstack(vectors)
+
+    ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+    return ids, faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+
+
+def evaluate_index_types(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    index_types: List[str] = None,
+    metric: int = faiss.METRIC_L2
+) -> List[Dict]:
+    """
+    Recall/latency report for each index type against exact search
+
+    Args:
+        vectors: (n, dim) float32 corpus vectors
+        queries: (q, dim) float32 query vectors
+        k: Neighbours compared for recall@k
+        index_types: Types to evaluate (default: all that can be trained on n vectors)
+        metric: faiss metric
+
+    Returns:
+        One dict per index type with recall_at_k, latency and memory figures
+    """
+    n, dimension = vectors.shape
+    ids = np.arange(n, dtype=np.int64)
+    k = min(k, n)
+    index_types = index_types or [t for t in INDEX_TYPES if n >= min_training_vectors(t)]
+
+    exact = faiss.index_factory(dimension, "Flat", metric)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    report = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_index(index_type, dimension, vectors, metric)
+        index.add_with_ids(vectors, ids)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = np.empty_like(truth)
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            _, found[i:i + 1] = index.search(query[None, :], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        hits = sum(len(set(found[i]) & set(truth[i])) for i in range(len(queries)))
+        report.append({
+            "index_type": index_type,
+            "factory": factory_string(index_type, dimension, n),
+            "vectors": n,
+            "recall_at_k": hits / (len(queries) * k),
+            "k": k,
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+            "bytes_per_vector": code_size(index),
+            "build_seconds": build_seconds
+        })
+    return report
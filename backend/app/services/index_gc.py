@@ -0,0 +1,286 @@
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Set
+
+from app.core.config import INDEX_GC_INTERVAL_SECONDS, INDEX_GC_GRACE_SECONDS, CONTENT_STORE_RETENTION_SECONDS
+from app.core.executor import InstrumentedExecutor
+from app.db.database import get_db
+from app.services.chunk_store import ChunkStore
+from app.services.content_store import ContentStore, content_store
+from app.services.faiss_store import FAISSVectorStore, faiss_store, is_legacy_index, CHUNK_STORE_FILE, INDEX_FILE
+
+
+def _disk_usage(path: str) -> int:
+    """Total size of the files under path"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class IndexGarbageCollector:
+    """
+    Reconciles the vector store with session_documents in the app database
+    Removes indexes of deleted sessions and documents, directories and files
+    no manifest refers to, then compacts and vacuums fragmented sessions.
+    Stored upload content no listed document refers to is purged once it
+    has been unused for the retention period.
+    Anything touched within the grace period is left alone, since uploads
+    create the index before their session_documents row
+    """
+
+    def __init__(
+        self,
+        store: FAISSVectorStore,
+        content: ContentStore,
+        interval_seconds: int = 3600,
+        grace_seconds: int = 600,
+        content_retention_seconds: int = 86400
+    ):
+        self.store = store
+        self.content = content
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.content_retention_seconds = content_retention_seconds
+        self.last_report = None
+        self._lock = threading.Lock()
+        # On-demand runs, kept off the ingest executor so a long pass does not hold up uploads
+        self.executor = InstrumentedExecutor("index-gc", 1)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """
+        Migrate legacy indexes, then run collect() every interval_seconds,
+        in a daemon thread (an interval of 0 disables collection only)
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="index-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        try:
+            self.migrate_legacy_indexes()
+        except Exception as e:
+            print(f"[GC] Legacy index migration failed: {e}")
+        if self.interval_seconds <= 0:
+            return
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"[GC] Run failed: {e}")
+
+    def migrate_legacy_indexes(self) -> Dict[str, int]:
+        """
+        Move per-document indexes from the pre-session layout into session
+        indexes, for documents session_documents still lists. Those that
+        fail stay on disk (collection skips them) and are reported
+
+        Returns:
+            Counts of migrated and failed documents
+        """
+        with self._lock:
+            report = {"migrated": 0, "failed": 0}
+            legacy = self.store.legacy_indexes()
+            if not legacy:
+                return report
+
+            owners = {
+                f"{session_id}_{document_id}": (session_id, document_id)
+                for session_id, documents in self._expected_documents().items()
+                for document_id in documents
+            }
+            for name, path in legacy.items():
+                if name not in owners:
+                    continue  # Its document was deleted; collected as an orphan directory
+                session_id, document_id = owners[name]
+                try:
+                    self.store.migrate_legacy_index(path, session_id, document_id)
+                    report["migrated"] += 1
+                except Exception as e:
+                    report["failed"] += 1
+                    print(f"[GC] Could not migrate legacy index {name}, the document must be re-uploaded: {e}")
+
+        print(f"[GC] Migrated {report['migrated']} legacy document indexes, {report['failed']} failed")
+        return report
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        One reconciliation pass
+
+        Returns:
+            Report with counts of removed sessions, documents and files,
+            compacted sessions, purged content, and reclaimed_bytes
+        """
+        with self._lock:
+            start = time.perf_counter()
+            report = {
+                "orphan_sessions": 0,
+                "orphan_documents": 0,
+                "orphan_directories": 0,
+                "orphan_files": 0,
+                "compacted_sessions": 0,
+                "purged_content": 0,
+                "reclaimed_bytes": 0
+            }
+            before = _disk_usage(self.store.persist_directory)
+
+            expected = self._expected_documents()
+            live_sessions = self._remove_orphan_indexes(expected, report)
+            self._remove_orphan_directories(expected, report)
+            for session_id, path in live_sessions.items():
+                self._remove_orphan_files(path, report)
+                self._compact(session_id, path, report)
+            self._purge_content(report)
+
+            report["reclaimed_bytes"] = max(before - _disk_usage(self.store.persist_directory), 0)
+            report["duration_seconds"] = round(time.perf_counter() - start, 3)
+            report["finished_at"] = datetime.now().isoformat()
+            self.last_report = report
+
+        print(
+            f"[GC] Removed {report['orphan_sessions']} sessions, {report['orphan_documents']} documents, "
+            f"{report['orphan_directories']} directories, {report['orphan_files']} files; "
+            f"compacted {report['compacted_sessions']}; purged {report['purged_content']} stored uploads; reclaimed {report['reclaimed_bytes']} bytes"
+        )
+        return report
+
+    def _expected_documents(self) -> Dict[str, Set[str]]:
+        """session_id -> document ids the app database still knows about, or that a job is still indexing"""
+        expected = {}
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """SELECT session_id, document_id FROM session_documents
+                   UNION SELECT session_id, document_id FROM ingestion_jobs WHERE status IN ('queued', 'running')"""
+            )
+            for row in cursor.fetchall():
+                expected.setdefault(row["session_id"], set()).add(row["document_id"])
+        return expected
+
+    def _referenced_content(self) -> Set[str]:
+        """Content hashes of listed documents and of uploads still being ingested"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """SELECT DISTINCT content_sha256 FROM ingestion_jobs
+                   WHERE content_sha256 IS NOT NULL
+                   AND (status IN ('queued', 'running') OR document_id IN (SELECT document_id FROM session_documents))"""
+            )
+            return {row["content_sha256"] for row in cursor.fetchall()}
+
+    def _purge_content(self, report: Dict[str, Any]):
+        try:
+            report["purged_content"] = self.content.purge(self._referenced_content(), self.content_retention_seconds)
+        except Exception as e:
+            print(f"[GC] Could not purge the content store: {e}")
+
+    def _is_recent(self, timestamp) -> bool:
+        if timestamp is None:
+            return False
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp).timestamp()
+            except ValueError:
+                return False
+        return time.time() - timestamp < self.grace_seconds
+
+    def _remove_orphan_indexes(self, expected: Dict[str, Set[str]], report: Dict[str, Any]) -> Dict[str, str]:
+        """Delete catalogued sessions/documents missing from session_documents, returns kept session -> index path"""
+        live_sessions = {}
+        for session_id in self.store.catalog.list_sessions():
+            entry = self.store.catalog.get_session(session_id)
+            if entry is None:
+                continue
+
+            documents = expected.get(session_id)
+            if documents is None:
+                if self._is_recent(entry["updated_at"]):
+                    live_sessions[session_id] = entry["index_path"]
+                    continue
+                self._delete(session_id, None, report, "orphan_sessions")
+                continue
+
+            live_sessions[session_id] = entry["index_path"]
+            for document_id, info in entry["documents"].items():
+                if document_id not in documents and not self._is_recent(info["created_at"]):
+                    self._delete(session_id, document_id, report, "orphan_documents")
+        return live_sessions
+
+    def _delete(self, session_id: str, document_id: str, report: Dict[str, Any], counter: str):
+        try:
+            self.store.delete_index(session_id, document_id)
+            report[counter] += 1
+        except Exception as e:
+            print(f"[GC] Could not delete index {session_id}/{document_id or '*'}: {e}")
+
+    def _remove_orphan_directories(self, expected: Dict[str, Set[str]], report: Dict[str, Any]):
+        """Delete index directories the catalog does not know about"""
+        catalogued = set(self.store.catalog.list_sessions())
+        # Legacy per-document indexes of listed documents wait for migrate_legacy_indexes
+        legacy_live = {f"{session_id}_{document_id}" for session_id, documents in expected.items() for document_id in documents}
+        for entry in os.scandir(self.store.persist_directory):
+            if not entry.is_dir() or entry.name in catalogued:
+                continue
+            if entry.name in legacy_live and is_legacy_index(entry.path):
+                continue
+            if self._is_recent(entry.stat().st_mtime):
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            report["orphan_directories"] += 1
+
+    def _remove_orphan_files(self, path: str, report: Dict[str, Any]):
+        """Delete index files left behind by interrupted saves or compactions"""
+        if not os.path.exists(os.path.join(path, CHUNK_STORE_FILE)):
+            return
+
+        chunk_store = ChunkStore(os.path.join(path, CHUNK_STORE_FILE))
+        referenced = set(chunk_store.segments().values())
+        referenced.add(chunk_store.base_file() or INDEX_FILE)
+
+        for entry in os.scandir(path):
+            orphan = entry.name.endswith(".tmp") or (entry.name.endswith(".faiss") and entry.name not in referenced)
+            if not entry.is_file() or not orphan or self._is_recent(entry.stat().st_mtime):
+                continue
+            try:
+                os.remove(entry.path)
+                report["orphan_files"] += 1
+            except OSError as e:
+                print(f"[GC] Could not remove {entry.path}: {e}")
+
+    def _compact(self, session_id: str, path: str, report: Dict[str, Any]):
+        """Fold segments/tombstones into the base and shrink the session's SQLite files"""
+        if not os.path.exists(os.path.join(path, CHUNK_STORE_FILE)):
+            return
+
+        chunk_store = ChunkStore(os.path.join(path, CHUNK_STORE_FILE))
+        try:
+            # Checked on the manifest, so idle sessions are not loaded just to find nothing to do
+            # A queued or running background compaction covers it already
+            pending = self.store.compaction_in_progress(session_id)
+            if not pending and (len(chunk_store.segments()) > 1 or chunk_store.tombstones()):
+                if self.store.compact(session_id, force=True):
+                    report["compacted_sessions"] += 1
+            self.store.vacuum(session_id)
+        except Exception as e:
+            print(f"[GC] Could not compact {session_id}: {e}")
+
+
+# Global instance
+index_gc = IndexGarbageCollector(
+    faiss_store, content_store, INDEX_GC_INTERVAL_SECONDS, INDEX_GC_GRACE_SECONDS, CONTENT_STORE_RETENTION_SECONDS
+)
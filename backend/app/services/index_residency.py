@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class IndexResidencyManager:
+    """
+    Memory-bounded cache of loaded vector indexes
+    Evicts least recently used entries once the byte budget is exceeded and
+    drops entries that have been idle longer than the TTL
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> [value, nbytes, last_access]
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        """Return a resident entry (marking it recently used) or None"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            entry[2] = time.monotonic()
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: Any, nbytes: int):
+        """Add or resize an entry, evicting others to stay within budget"""
+        with self._lock:
+            if key in self._entries:
+                self._resident_bytes -= self._entries[key][1]
+            self._entries[key] = [value, nbytes, time.monotonic()]
+            self._entries.move_to_end(key)
+            self._resident_bytes += nbytes
+
+            self._expire()
+            # The entry just added always stays, even if it alone exceeds the budget
+            while self._resident_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self._resident_bytes -= evicted_bytes
+                self.evictions += 1
+                print(f"[RESIDENCY] Evicted {evicted_key} ({evicted_bytes} bytes)")
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._resident_bytes -= entry[1]
+            return entry[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the budget"""
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "resident_indexes": len(self._entries),
+            "resident_bytes": self._resident_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are kept in access order, so idle ones are at the front
+        while self._entries:
+            key, (_, nbytes, last_access) = next(iter(self._entries.items()))
+            if last_access >= cutoff:
+                break
+            del self._entries[key]
+            self._resident_bytes -= nbytes
+            self.expirations += 1
@@ -0,0 +1,273 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import INGESTION_JOB_WORKERS
+from app.db.database import get_db
+from app.services.chat_service import chat_service
+from app.services.content_store import content_store
+from app.services.faiss_store import faiss_store
+from app.services.ingestion_pipeline import ingestion_pipeline
+from app.services.speech_to_text import speech_to_text_service
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Progress counters are persisted at most this often (stage changes are always written)
+PROGRESS_WRITE_INTERVAL_SECONDS = 0.5
+
+# Pipeline progress stage -> (job stage, counter column)
+PROGRESS_COLUMNS = {
+    "pages": ("parsing", "pages_parsed"),
+    "chunks": ("embedding", "chunks_created"),
+    "embedded": ("indexing", "chunks_embedded"),
+    "indexed": ("indexing", "chunks_indexed")
+}
+
+
+class IngestionJobQueue:
+    """
+    Runs uploads (PDF extraction/OCR, transcription, embedding, indexing) in
+    a worker pool outside the HTTP request; the embedding and indexing part
+    runs on the vector store's ingest pool. Job state and per-stage progress
+    live in the ingestion_jobs table; a document's session_documents row is
+    written only when its job completes, so it never lists half-indexed files
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest-job")
+        return self._executor
+
+    def recover(self):
+        """Fail jobs left queued/running by a previous process; their spooled uploads are gone"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE ingestion_jobs SET status = 'failed', error = ?, updated_at = ? WHERE status NOT IN ('completed', 'failed')",
+                ("Interrupted by server restart", datetime.now().isoformat())
+            )
+            conn.commit()
+            if cursor.rowcount:
+                print(f"[JOBS] Marked {cursor.rowcount} interrupted job(s) as failed")
+
+    def submit(
+        self,
+        session_id: str,
+        document_id: str,
+        file_path: str,
+        filename: str,
+        document_type: str,
+        content_sha256: str = None
+    ) -> str:
+        """
+        Queue a saved upload for ingestion
+
+        Args:
+            session_id: Session the document belongs to
+            document_id: Id for the new document
+            file_path: Spooled upload; the job deletes it when done
+            filename: Original file name
+            document_type: 'pdf' for documents, 'media' for audio/video (resolved on transcription)
+            content_sha256: SHA-256 of the upload; identical content already processed is reused
+
+        Returns:
+            job_id
+        """
+        job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        with get_db() as conn:
+            conn.execute(
+                """INSERT INTO ingestion_jobs
+                   (job_id, session_id, document_id, document_name, document_type, content_sha256, status, stage, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, 'queued', 'queued', ?, ?)""",
+                (job_id, session_id, document_id, filename, document_type, content_sha256, now, now)
+            )
+            conn.commit()
+
+        self.executor.submit(
+            self._run, job_id, session_id, document_id, file_path, filename, document_type, content_sha256
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with get_db() as conn:
+            row = conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        # The content store is shared across users; the hash would tell who else uploaded the file
+        job.pop("content_sha256", None)
+        return job
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with get_db() as conn:
+            conn.execute(f"UPDATE ingestion_jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            conn.commit()
+
+    def _progress_writer(self, job_id: str):
+        """Pipeline progress callback that persists counters, throttled"""
+        state = {"stage": None, "written_at": 0.0}
+
+        def progress(event: str, count: int):
+            stage, column = PROGRESS_COLUMNS[event]
+            now = time.monotonic()
+            if stage == state["stage"] and now - state["written_at"] < PROGRESS_WRITE_INTERVAL_SECONDS:
+                return
+            state.update(stage=stage, written_at=now)
+            self._update(job_id, stage=stage, **{column: count})
+
+        return progress
+
+    def _run(
+        self,
+        job_id: str,
+        session_id: str,
+        document_id: str,
+        file_path: str,
+        filename: str,
+        document_type: str,
+        content_sha256: str = None
+    ):
+        start = time.perf_counter()
+        self._update(job_id, status="running", stage="parsing")
+        try:
+            content = content_store.get(content_sha256) if content_sha256 else None
+            if content and (content["document_type"] == "pdf") != (document_type == "pdf"):
+                content = None
+            if content:
+                print(f"[DEDUP] {filename} matches stored content {content_sha256[:12]}, reusing it")
+
+            if document_type == "pdf":
+                result, progress = self._ingest_pdf(
+                    job_id, session_id, document_id, file_path, filename, content_sha256, content
+                )
+            else:
+                if content:
+                    text, info = content_store.pages(content_sha256)[0]
+                    transcription = {"text": text, **info}
+                else:
+                    self._update(job_id, stage="transcribing")
+                    transcription = speech_to_text_service.process_path(file_path, filename)
+                document_type = transcription["file_type"]
+                self._update(job_id, stage="indexing", document_type=document_type)
+                chunk_count = self._index_transcript(
+                    transcription, filename, session_id, document_id, content_sha256, content
+                )
+                result = {
+                    "chunks_created": chunk_count,
+                    "transcription": transcription["text"],
+                    "language": transcription["language"],
+                    "file_type": document_type
+                }
+                progress = {"chunks_created": chunk_count, "chunks_embedded": chunk_count, "chunks_indexed": chunk_count}
+
+            # Listed only now that it is fully indexed, and only if the session was not deleted meanwhile
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """INSERT INTO session_documents (session_id, document_id, document_name, document_type, uploaded_at)
+                       SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM chat_sessions WHERE session_id = ?)""",
+                    (session_id, document_id, filename, document_type, datetime.now().isoformat(), session_id)
+                )
+                conn.commit()
+            if not cursor.rowcount:
+                faiss_store.ingest_executor.call(faiss_store.delete_index, session_id, document_id)
+                raise RuntimeError("Session was deleted during ingestion")
+
+            self._update(job_id, status="completed", stage="completed", result=json.dumps(result), **progress)
+            print(f"[JOBS] {job_id} ({filename}) completed in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            import traceback
+            print(f"[JOBS] {job_id} ({filename}) failed: {e}\n{traceback.format_exc()}")
+            self._update(job_id, status="failed", error=str(e))
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _ingest_pdf(self, job_id, session_id, document_id, file_path, filename, content_sha256, content):
+        """Index a PDF: stored chunks as-is, stored pages re-chunked, or the file from scratch"""
+        progress_writer = self._progress_writer(job_id)
+        recorder = None
+        if content and content["chunking"] == ingestion_pipeline.chunking_key:
+            # Vectors come from the embedding cache, so this skips extraction, OCR and the model
+            chunks, metas, parents = content_store.chunks(content_sha256)
+            metas = [{**m, "source": filename} for m in metas]
+            batches = ingestion_pipeline.batch(ingestion_pipeline.stored_groups(chunks, metas, parents))
+            counts = faiss_store.ingest_executor.call(
+                ingestion_pipeline.ingest_batches, batches, session_id, document_id, progress_writer
+            )
+            counts["pages"] = content["page_count"]
+        elif content:
+            # Chunking settings changed since it was stored: skip extraction/OCR only, and
+            # store the new chunks in place of the old ones so later reuse matches the index
+            pages = [(text, {**meta, "source": filename}) for text, meta in content_store.pages(content_sha256)]
+            recorder = content_store.recorder(content_sha256)
+            counts = faiss_store.ingest_executor.call(
+                ingestion_pipeline.ingest, pages, session_id, document_id, progress_writer, recorder
+            )
+        else:
+            recorder = content_store.recorder(content_sha256) if content_sha256 else None
+            counts = faiss_store.ingest_executor.call(
+                ingestion_pipeline.ingest_pdf, file_path, filename, session_id, document_id, progress_writer, recorder
+            )
+
+        if recorder:
+            if counts["chunks"]:
+                recorder.commit("pdf", ingestion_pipeline.chunking_key)
+            else:
+                recorder.abort()
+
+        if not counts["chunks"]:
+            # Nothing was indexed, so the document must not be listed
+            raise ValueError("No text could be extracted from the PDF")
+
+        result = {"chunks_created": counts["chunks"], "pages": counts["pages"]}
+        progress = {
+            "pages_parsed": counts["pages"],
+            "chunks_created": counts["chunks"],
+            "chunks_embedded": counts["chunks"],
+            "chunks_indexed": counts["chunks"]
+        }
+        return result, progress
+
+    def _index_transcript(self, transcription, filename, session_id, document_id, content_sha256, content) -> int:
+        """Index a transcription, recording it (and its chunks) on first sight of the content"""
+        if content:
+            chunks, metas, _ = content_store.chunks(content_sha256)
+            metas = [{**m, "source": filename} for m in metas]
+        else:
+            chunks, metas = chat_service.transcript_chunks(transcription, filename)
+        if not chunks:
+            # As for PDFs: nothing was indexed, so the document must not be listed
+            raise ValueError("No speech could be transcribed from the file")
+
+        faiss_store.ingest_executor.call(faiss_store.create_index, chunks, metas, session_id, document_id)
+        recorder = content_store.recorder(content_sha256) if content_sha256 and not content else None
+        if recorder:
+            recorder.page(
+                transcription["text"],
+                {"file_type": transcription["file_type"], "language": transcription["language"]}
+            )
+            recorder.batch(chunks, metas, [])
+            recorder.commit("media", "flat")
+        return len(chunks)
+
+
+# Global instance
+ingestion_jobs = IngestionJobQueue(INGESTION_JOB_WORKERS)
@@ -0,0 +1,219 @@
+import hashlib
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from fastapi import UploadFile
+
+from app.core.config import CHUNKING_MODE, CHILD_CHUNK_SIZE, PARENT_CHUNK_SIZE, INGEST_BATCH_SIZE
+from app.services.document_processor import DocumentProcessor, document_processor
+from app.services.faiss_store import FAISSVectorStore, faiss_store
+
+UPLOAD_READ_BYTES = 1024 * 1024
+
+# (chunks, metadatas, parents) of one or more pages; chunk metadata 'parent' indexes parents
+ChunkBatch = Tuple[List[str], List[Dict], List[str]]
+
+
+async def save_upload(file: UploadFile, suffix: str = "") -> Tuple[str, str]:
+    """
+    Copy an upload to a temp file in fixed-size reads; the caller removes it
+
+    Returns:
+        Tuple of (path, SHA-256 hex digest of the content)
+    """
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        while True:
+            block = await file.read(UPLOAD_READ_BYTES)
+            if not block:
+                break
+            digest.update(block)
+            tmp.write(block)
+    return tmp.name, digest.hexdigest()
+
+
+class IngestionPipeline:
+    """
+    Streams a document from disk into the vector store: pages are chunked as
+    they are extracted, chunks are grouped into batches, and each batch is
+    embedded and appended to the document's index before the next is built.
+    Every stage is a generator pulled by the one after it, so peak memory
+    follows the batch size rather than the document size
+    """
+
+    def __init__(
+        self,
+        processor: DocumentProcessor,
+        store: FAISSVectorStore,
+        batch_size: int = 256,
+        chunking_mode: str = "flat"
+    ):
+        self.processor = processor
+        self.store = store
+        self.batch_size = batch_size
+        self.chunking_mode = chunking_mode
+
+    def chunk_pages(self, pages: Iterable[Tuple[str, Dict]]) -> Iterator[ChunkBatch]:
+        """Chunk page by page, yielding each page's chunks"""
+        for text, meta in pages:
+            if self.chunking_mode == "hierarchical":
+                yield self.processor.hierarchical_chunking([text], [meta], CHILD_CHUNK_SIZE, PARENT_CHUNK_SIZE)
+            else:
+                chunks, metas = self.processor.chunk_documents([text], [meta])
+                yield chunks, metas, []
+
+    def batch(self, page_chunks: Iterable[ChunkBatch]) -> Iterator[ChunkBatch]:
+        """
+        Group page chunks into batches of at least batch_size chunks (the last
+        may be smaller). Pages are never split, so a parent and all of its
+        children always land in the same batch
+        """
+        chunks, metas, parents = [], [], []
+        for page_chunk_texts, page_metas, page_parents in page_chunks:
+            offset = len(parents)
+            chunks.extend(page_chunk_texts)
+            metas.extend({**m, "parent": m["parent"] + offset} if "parent" in m else m for m in page_metas)
+            parents.extend(page_parents)
+            if len(chunks) >= self.batch_size:
+                yield chunks, metas, parents
+                chunks, metas, parents = [], [], []
+        if chunks:
+            yield chunks, metas, parents
+
+    @staticmethod
+    def stored_groups(chunks: List[str], metas: List[Dict], parents: List[str]) -> Iterator[ChunkBatch]:
+        """
+        Split one stored document's chunks back into the groups batch() takes:
+        a parent with its children, or single chunks when there are no parents
+        """
+        start = 0
+        while start < len(chunks):
+            end = start + 1
+            if "parent" in metas[start]:
+                parent = metas[start]["parent"]
+                while end < len(chunks) and metas[end].get("parent") == parent:
+                    end += 1
+                yield chunks[start:end], [{**m, "parent": 0} for m in metas[start:end]], [parents[parent]]
+            else:
+                yield chunks[start:end], metas[start:end], []
+            start = end
+
+    @property
+    def chunking_key(self) -> str:
+        """Identifies the chunking configuration, so stored chunks are only reused under the same one"""
+        if self.chunking_mode == "hierarchical":
+            return f"hierarchical:{CHILD_CHUNK_SIZE}:{PARENT_CHUNK_SIZE}"
+        return self.chunking_mode
+
+    def ingest(
+        self,
+        pages: Iterable[Tuple[str, Dict]],
+        session_id: str,
+        document_id: str,
+        progress: Callable[[str, int], None] = None,
+        recorder=None
+    ) -> Dict[str, int]:
+        """
+        Chunk, embed and index a stream of pages as one document
+
+        Args:
+            pages: (text, metadata) per page, in order
+            session_id: Session identifier
+            document_id: Document identifier; an existing document with this id is replaced
+            progress: Optional callback(stage, count) with running totals for
+                      'pages', 'chunks', 'embedded' and 'indexed'
+            recorder: Optional ContentRecorder receiving pages and indexed batches
+
+        Returns:
+            Dict with pages, chunks and batches counts
+        """
+        page_count = [0]
+
+        def counted(pages_iter):
+            for text, meta in pages_iter:
+                page_count[0] += 1
+                if recorder:
+                    recorder.page(text, meta)
+                if progress:
+                    progress("pages", page_count[0])
+                yield text, meta
+
+        counts = self.ingest_batches(
+            self.batch(self.chunk_pages(counted(pages))), session_id, document_id, progress, recorder
+        )
+        counts["pages"] = page_count[0]
+        return counts
+
+    def ingest_batches(
+        self,
+        batches: Iterable[ChunkBatch],
+        session_id: str,
+        document_id: str,
+        progress: Callable[[str, int], None] = None,
+        recorder=None
+    ) -> Dict[str, int]:
+        """
+        Embed and index already chunked batches as one document (see ingest)
+
+        Returns:
+            Dict with chunks and batches counts
+        """
+        counts = {"pages": 0, "chunks": 0, "batches": 0}
+        start = time.perf_counter()
+        try:
+            for chunks, metas, parents in batches:
+                counts["chunks"] += len(chunks)
+                if progress:
+                    progress("chunks", counts["chunks"])
+                embeddings = self.store.embed_documents(chunks)
+                if progress:
+                    progress("embedded", counts["chunks"])
+                # The first batch replaces any earlier version of the document, later ones
+                # append as segments; compaction waits for the last batch, so a long
+                # document is merged into the base once rather than every few batches
+                self.store.create_index(
+                    chunks, metas, session_id, document_id, parents or None,
+                    append=counts["batches"] > 0, embeddings=embeddings, defer_compaction=True
+                )
+                counts["batches"] += 1
+                if recorder:
+                    recorder.batch(chunks, metas, parents)
+                if progress:
+                    progress("indexed", counts["chunks"])
+        except Exception:
+            if recorder:
+                recorder.abort()
+            # Leave no half-indexed document behind
+            if counts["batches"]:
+                self.store.delete_index(session_id, document_id)
+            raise
+
+        self.store.schedule_compaction(session_id)
+        print(
+            f"[INGEST] {document_id}: {counts['chunks']} chunks "
+            f"in {counts['batches']} batches, {time.perf_counter() - start:.2f}s"
+        )
+        return counts
+
+    def ingest_pdf(
+        self,
+        pdf_path: str,
+        source_name: str,
+        session_id: str,
+        document_id: str,
+        progress: Callable[[str, int], None] = None,
+        recorder=None
+    ) -> Dict[str, int]:
+        """Stream a PDF on disk through extraction/OCR, chunking, embedding and indexing"""
+        return self.ingest(
+            self.processor.iter_pdf_pages(pdf_path, source_name),
+            session_id,
+            document_id,
+            progress,
+            recorder
+        )
+
+
+# Global instance
+ingestion_pipeline = IngestionPipeline(document_processor, faiss_store, INGEST_BATCH_SIZE, CHUNKING_MODE)
@@ -0,0 +1,145 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from app.db.database import connect
+
+# Keeps section numbers and citations intact as tokens: "498A" -> "498a", "164(1)" -> "164", "1"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SCHEMA_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens without stopwords"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    On-disk inverted index (SQLite) with BM25 scoring for one session
+    Complements the dense index on exact tokens such as section numbers
+    ("498A") and case citations ("AIR 1973 SC 1461")
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lexical_docs (
+                    vector_id INTEGER PRIMARY KEY,
+                    document_number INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lexical_postings (
+                    term TEXT NOT NULL,
+                    vector_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, vector_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_lexical_docs_document ON lexical_docs(document_number)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_lexical_postings_vector ON lexical_postings(vector_id)")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+
+    def add(self, vector_ids: List[int], document_number: int, texts: List[str]):
+        """Index the chunks of one document"""
+        docs, postings = [], []
+        for vector_id, text in zip(vector_ids, texts):
+            terms = Counter(tokenize(text))
+            docs.append((vector_id, document_number, sum(terms.values())))
+            postings.extend((term, vector_id, tf) for term, tf in terms.items())
+
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR REPLACE INTO lexical_docs (vector_id, document_number, length) VALUES (?, ?, ?)",
+                docs
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO lexical_postings (term, vector_id, tf) VALUES (?, ?, ?)",
+                postings
+            )
+            conn.commit()
+
+    def remove_document(self, document_number: int):
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM lexical_postings WHERE vector_id IN (SELECT vector_id FROM lexical_docs WHERE document_number = ?)",
+                (document_number,)
+            )
+            cursor.execute("DELETE FROM lexical_docs WHERE document_number = ?", (document_number,))
+            conn.commit()
+
+    def search(self, query_text: str, top_k: int, document_numbers: List[int] = None) -> List[Tuple[int, float]]:
+        """
+        BM25 search
+
+        Args:
+            query_text: Query string
+            top_k: Number of results to return
+            document_numbers: Documents to search (None = all)
+
+        Returns:
+            List of (vector_id, bm25 score), best first
+        """
+        terms = list(dict.fromkeys(tokenize(query_text)))
+        if not terms:
+            return []
+
+        placeholders = ",".join("?" * len(terms))
+        with connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), AVG(length) FROM lexical_docs")
+            n_docs, avg_length = cursor.fetchone()
+            if not n_docs:
+                return []
+
+            # Document frequencies are collection-wide, even when the search is restricted
+            cursor.execute(
+                f"SELECT term, COUNT(*) FROM lexical_postings WHERE term IN ({placeholders}) GROUP BY term",
+                terms
+            )
+            idf = {
+                term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for term, df in cursor.fetchall()
+            }
+            if not idf:
+                return []
+
+            sql = f"""
+                SELECT p.term, p.vector_id, p.tf, d.length
+                FROM lexical_postings p JOIN lexical_docs d ON p.vector_id = d.vector_id
+                WHERE p.term IN ({placeholders})
+            """
+            params = list(terms)
+            if document_numbers is not None:
+                sql += f" AND d.document_number IN ({','.join('?' * len(document_numbers))})"
+                params += list(document_numbers)
+            cursor.execute(sql, params)
+
+            scores: Dict[int, float] = {}
+            for term, vector_id, tf, length in cursor.fetchall():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+                scores[vector_id] = scores.get(vector_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from app.core.config import MODEL_WARMUP
+from app.services.faiss_store import faiss_store
+from app.services.reranker import reranker
+
+
+def _warm_embeddings():
+    # Straight to the backend so the probe vector does not land in the query cache
+    faiss_store.embeddings.embed_query("Section 420 IPC cheating")
+
+
+def _warm_whisper():
+    from app.services.speech_to_text import speech_to_text_service
+    speech_to_text_service.model
+
+
+def _warm_reranker():
+    reranker.model.predict([("Section 420 IPC", "Cheating and dishonestly inducing delivery of property")])
+
+
+WARMERS: Dict[str, Callable[[], None]] = {
+    "embeddings": _warm_embeddings,
+    "whisper": _warm_whisper,
+    "reranker": _warm_reranker
+}
+
+
+class ModelWarmup:
+    """
+    Loads the configured models in a background thread at startup, so the
+    first upload or chat after a deploy does not pay for loading torch and
+    the weights. The models' lazy loaders are locked, so a request that
+    arrives mid-warm-up waits for that load rather than starting another
+    """
+
+    def __init__(self, models: List[str]):
+        self.models = [m for m in models if m in WARMERS]
+        self._state = {name: {"status": "pending", "load_seconds": None, "error": None} for name in self.models}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        if not self.models:
+            self._done.set()
+
+    def start(self):
+        """Begin loading in a daemon thread (no-op if nothing is configured or already started)"""
+        if self._done.is_set() or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name in self.models:
+            self._set(name, status="loading")
+            print(f"[WARMUP] Loading {name}")
+            start = time.perf_counter()
+            try:
+                WARMERS[name]()
+                self._set(name, status="ready", load_seconds=round(time.perf_counter() - start, 3))
+                print(f"[WARMUP] {name} ready in {time.perf_counter() - start:.1f}s")
+            except Exception as e:
+                # Left to load lazily on first use; readiness reports the failure
+                self._set(name, status="failed", error=str(e))
+                print(f"[WARMUP] {name} failed: {e}")
+        self._done.set()
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._state[name].update(fields)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Ready once warm-up has finished: a model that failed to warm up is
+        listed under 'failed' but still loads lazily on its first request
+        """
+        with self._lock:
+            models = {name: dict(state) for name, state in self._state.items()}
+        finished = self._done.is_set()
+        failed = [name for name, m in models.items() if m["status"] == "failed"]
+        return {"ready": finished, "finished": finished, "failed": failed, "models": models}
+
+
+def _configured_models() -> List[str]:
+    models = [m.strip() for m in MODEL_WARMUP.split(",") if m.strip()]
+    if models and reranker.enabled and "reranker" not in models:
+        models.append("reranker")
+    return models
+
+
+# Global instance
+model_warmup = ModelWarmup(_configured_models())
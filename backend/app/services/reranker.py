@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from app.core.config import (
+    RERANK_ENABLED, RERANK_MODEL, RERANK_CANDIDATES, RERANK_TOP_K, RERANK_BATCH_SIZE, RERANK_CACHE_SIZE
+)
+from app.services.embedding_cache import normalize_chunk_text
+
+
+class CrossEncoderReranker:
+    """
+    Second retrieval stage: scores (query, chunk) pairs with a small CPU
+    cross-encoder and keeps the best few, so the prompt gets fewer, more
+    precise chunks. Scores are cached by (query hash, chunk text hash): a
+    score depends only on the pair's text, and vector ids are not stable
+    keys (a deleted and recreated session hands out the same ids again)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        enabled: bool = False,
+        candidates: int = 20,
+        top_k: int = 3,
+        batch_size: int = 32,
+        cache_size: int = 10000
+    ):
+        self.model_name = model_name
+        self.enabled = enabled
+        self.candidates = candidates  # retrieval depth fed to the cross-encoder
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+
+        self._model = None
+        self._lock = threading.Lock()
+        self._scores = OrderedDict()  # (query hash, chunk text hash) -> score, LRU
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    print(f"Loading reranker model: {self.model_name}")
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        # Query and chunk alike: whitespace only, since the model sees case
+        return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()[:16]
+
+    def rerank(self, query_text: str, results: List[Dict], top_k: int = None) -> List[Dict]:
+        """
+        Reorder retrieval results by cross-encoder relevance
+
+        Args:
+            query_text: Query string
+            results: Results from faiss_store.query (need 'text')
+            top_k: Number of results to keep (default: self.top_k)
+
+        Returns:
+            The best top_k results, each with an added 'rerank_score'
+        """
+        top_k = top_k or self.top_k
+        if not results:
+            return []
+
+        query_hash = self._text_hash(query_text)
+        keys = [(query_hash, self._text_hash(r["text"])) for r in results]
+
+        scores = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[key] = self._scores[key]
+            missing = [(key, r["text"]) for key, r in zip(keys, results) if key not in scores]
+            self.hits += len(results) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # All uncached pairs in one batched forward pass
+            predicted = self.model.predict(
+                [(query_text, text) for _, text in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            with self._lock:
+                for (key, _), score in zip(missing, predicted):
+                    scores[key] = float(score)
+                    self._scores[key] = float(score)
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        ranked = sorted(zip(keys, results), key=lambda pair: scores[pair[0]], reverse=True)
+        return [{**result, "rerank_score": scores[key]} for key, result in ranked[:top_k]]
+
+    def stats(self) -> Dict[str, int]:
+        return {"enabled": self.enabled, "entries": len(self._scores), "hits": self.hits, "misses": self.misses}
+
+
+# Global instance
+reranker = CrossEncoderReranker(
+    RERANK_MODEL,
+    enabled=RERANK_ENABLED,
+    candidates=RERANK_CANDIDATES,
+    top_k=RERANK_TOP_K,
+    batch_size=RERANK_BATCH_SIZE,
+    cache_size=RERANK_CACHE_SIZE
+)
@@ -1,5 +1,6 @@
 import os
 import tempfile
+import threading
 from typing import Dict, Any
 from fastapi import UploadFile
 # Lazy imports: faster_whisper and pydub will be imported when needed
@@ -24,15 +25,18 @@ class SpeechToTextService:
         """
         self.model_size = model_size
         self._model = None
+        self._load_lock = threading.Lock()
 
     @property
     def model(self):
-        """Lazy load faster-whisper model only when needed"""
+        """Lazy load faster-whisper model only when needed (once, even under concurrent requests)"""
         if self._model is None:
-            from faster_whisper import WhisperModel  # Import only when model is actually used
-            print(f"Loading faster-whisper model: {self.model_size}")
-            self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
-            print("faster-whisper model loaded successfully")
+            with self._load_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel  # Import only when model is actually used
+                    print(f"Loading faster-whisper model: {self.model_size}")
+                    self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+                    print("faster-whisper model loaded successfully")
         return self._model
 
     def extract_audio_from_video(self, video_path: str) -> str:
@@ -166,43 +170,53 @@ class SpeechToTextService:
             tmp_path = tmp_file.name
 
         try:
-            audio_path = tmp_path
+            return self.process_path(tmp_path, file.filename, language)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def process_path(self, file_path: str, filename: str, language: str = None) -> Dict[str, Any]:
+        """
+        Transcribe an audio or video file already on disk (the file is left in place)
+
+        Args:
+            file_path: Path to the saved upload
+            filename: Original file name (its extension selects audio/video handling)
+            language: Optional ISO-639-1 language code, None = auto-detect
+
+        Returns:
+            Same dict as process_file
+        """
+        file_ext = os.path.splitext(filename)[1].lower()
+        if not self.is_supported_file(filename):
+            raise Exception(f"Unsupported file format: {file_ext}. Supported formats: {self.SUPPORTED_AUDIO_FORMATS | self.SUPPORTED_VIDEO_FORMATS}")
+
+        audio_path = file_path
+        try:
             file_type = "audio"
 
             # If video, extract audio first
             if file_ext in self.SUPPORTED_VIDEO_FORMATS:
                 file_type = "video"
-                print(f"Extracting audio from video: {file.filename}")
-                audio_path = self.extract_audio_from_video(tmp_path)
+                print(f"Extracting audio from video: {filename}")
+                audio_path = self.extract_audio_from_video(file_path)
             elif file_ext in (".webm", ".ogg", ".m4a", ".flac") and file_ext != ".wav":
                 # Convert non-wav audio formats to wav for better Whisper compatibility
-                print(f"Converting audio to WAV: {file.filename}")
-                audio_path = self.extract_audio_from_video(tmp_path)
+                print(f"Converting audio to WAV: {filename}")
+                audio_path = self.extract_audio_from_video(file_path)
 
             # Transcribe (pass language hint if provided, otherwise auto-detect)
-            print(f"Transcribing audio: {file.filename}, language: {language or 'auto'}")
+            print(f"Transcribing audio: {filename}, language: {language or 'auto'}")
             result = self.transcribe_audio(audio_path, language=language)
 
-            # Cleanup
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            if audio_path != tmp_path and os.path.exists(audio_path):
-                os.remove(audio_path)
-
             return {
                 "text": result["text"],
                 "language": result["language"],
                 "file_type": file_type,
-                "filename": file.filename
+                "filename": filename
             }
 
         except Exception as e:
-            # Cleanup on error
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            if audio_path != tmp_path and os.path.exists(audio_path):
-                os.remove(audio_path)
-
             error_msg = str(e)
             print(f"ERROR in speech_to_text.process_file: {error_msg}")
 
@@ -213,6 +227,10 @@ class SpeechToTextService:
                 raise Exception("faster-whisper model failed to load. Please run: pip install faster-whisper")
             else:
                 raise Exception(f"Error processing audio/video file: {error_msg}")
+        finally:
+            # Cleanup the converted audio; the caller owns file_path
+            if audio_path != file_path and os.path.exists(audio_path):
+                os.remove(audio_path)
 
     def is_supported_file(self, filename: str) -> bool:
         """Check if file format is supported"""
@@ -0,0 +1,190 @@
+"""
+Chunking benchmark for DocumentProcessor.legal_aware_chunking
+
+Generates large synthetic judgments with different line shapes and measures
+chunking throughput (MB/s) of the current implementation against the
+previous one, kept here as legacy_legal_aware_chunking: patterns compiled
+per call, the line buffer re-joined on every line and a new splitter per
+call. Both must produce identical chunks; the run fails if they do not.
+
+Usage (from backend/):
+    python -m benchmarks.chunking_benchmark --sizes-mb 1,5,20 --output chunking.json
+
+Line shapes:
+    paragraphs  typed judgments, one paragraph per line
+    ocr         scanned pages, short wrapped lines
+    citations   long runs of section and case references (tables of authorities)
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.common import synthetic_chunk, git_commit, NAMES, COURTS, ACTS
+from app.services.document_processor import document_processor
+
+SHAPES = ("paragraphs", "ocr", "citations")
+
+
+def legacy_legal_aware_chunking(text: str) -> List[str]:
+    """legal_aware_chunking as it was before the rewrite, for the baseline"""
+    SECTION_PATTERN = re.compile(
+        r"(Section\s+\d+[A-Z]?|IPC\s+\d+|CrPC\s+\d+|BNS\s+\d+)",
+        re.IGNORECASE
+    )
+    CASE_REFERENCE = re.compile(
+        r"(v\.|vs\.|versus|AIR\s+\d+|SCC\s+\d+)",
+        re.IGNORECASE
+    )
+
+    lines = text.split("\n")
+    buffer, chunks = [], []
+
+    for line in lines:
+        buffer.append(line)
+
+        if SECTION_PATTERN.search(line) or CASE_REFERENCE.search(line):
+            continue
+
+        if len(" ".join(buffer)) > 800:
+            chunks.append(" ".join(buffer))
+            buffer = []
+
+    if buffer:
+        chunks.append(" ".join(buffer))
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=900,
+        chunk_overlap=200,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+    final_chunks = []
+    for chunk in chunks:
+        if chunk.strip():
+            final_chunks.extend(splitter.split_text(chunk))
+
+    return final_chunks
+
+
+def wrap(paragraph: str, width: int) -> List[str]:
+    """Break a paragraph into lines of about width characters, as OCR output is"""
+    lines, line = [], []
+    length = 0
+    for word in paragraph.split():
+        if line and length + len(word) + 1 > width:
+            lines.append(" ".join(line))
+            line, length = [], 0
+        line.append(word)
+        length += len(word) + 1
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def citation_line(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return f"{rng.choice(NAMES)} v. {rng.choice(NAMES)}, AIR {rng.randint(1950, 2023)} {rng.choice(COURTS)} {rng.randint(1, 2500)}"
+    return f"Section {rng.randint(1, 511)} of the {rng.choice(ACTS)}"
+
+
+def synthetic_judgment(size_bytes: int, shape: str, seed: int) -> str:
+    """Judgment text of about size_bytes characters with the given line shape"""
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < size_bytes:
+        if shape == "paragraphs":
+            block = [synthetic_chunk(rng), ""]
+        elif shape == "ocr":
+            block = wrap(synthetic_chunk(rng), rng.randint(40, 70))
+        else:
+            block = [citation_line(rng) for _ in range(rng.randint(20, 60))]
+            block.append(synthetic_chunk(rng))
+        lines.extend(block)
+        size += sum(len(line) + 1 for line in block)
+    return "\n".join(lines)
+
+
+def measure(chunker: Callable[[str], List[str]], text: str, repeats: int) -> Dict:
+    """Best-of-repeats wall time and the chunks of the last run"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = chunker(text)
+        best = min(best, time.perf_counter() - start)
+    megabytes = len(text.encode()) / (1024 * 1024)
+    return {"seconds": best, "mb_per_second": megabytes / best, "chunks": chunks}
+
+
+def run_size(size_mb: float, shape: str, args) -> Dict:
+    text = synthetic_judgment(int(size_mb * 1024 * 1024), shape, args.seed)
+    before = measure(legacy_legal_aware_chunking, text, args.repeats)
+    after = measure(document_processor.legal_aware_chunking, text, args.repeats)
+    if before["chunks"] != after["chunks"]:
+        raise AssertionError(f"Chunk output differs for {size_mb} MB {shape}")
+
+    return {
+        "size_mb": size_mb,
+        "shape": shape,
+        "lines": text.count("\n") + 1,
+        "chunks": len(after["chunks"]),
+        "before": {"seconds": before["seconds"], "mb_per_second": before["mb_per_second"]},
+        "after": {"seconds": after["seconds"], "mb_per_second": after["mb_per_second"]},
+        "speedup": before["seconds"] / after["seconds"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="legal_aware_chunking throughput benchmark")
+    parser.add_argument("--sizes-mb", default="1,5,20", help="Comma-separated judgment sizes in MB")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="Comma-separated line shapes")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for size_mb in [float(s) for s in args.sizes_mb.split(",")]:
+        for shape in args.shapes.split(","):
+            result = run_size(size_mb, shape, args)
+            print(
+                f"[BENCH] {size_mb:g} MB {shape}: {result['before']['mb_per_second']:.2f} -> "
+                f"{result['after']['mb_per_second']:.2f} MB/s ({result['speedup']:.2f}x)",
+                flush=True
+            )
+            results.append(result)
+
+    report = {
+        "benchmark": "chunking",
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            "shapes": args.shapes.split(","),
+            "repeats": args.repeats,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[BENCH] Wrote {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Helpers shared by the benchmarks: synthetic legal-style text and run metadata
+
+Kept free of app imports, so a benchmark pulls in only the services it measures
+"""
+import random
+import subprocess
+from typing import List
+
+ACTS = ["IPC", "CrPC", "BNS", "Evidence Act", "Contract Act"]
+OFFENCES = [
+    "cheating", "criminal breach of trust", "cruelty", "theft", "criminal intimidation",
+    "forgery", "defamation", "dowry death", "murder", "culpable homicide", "extortion"
+]
+PARTIES = ["the accused", "the complainant", "the petitioner", "the respondent", "the witness", "the appellant"]
+COURTS = ["SC", "Del", "Bom", "Mad", "Cal", "All"]
+NAMES = ["Sharma", "Kumar", "Reddy", "Iyer", "Singh", "Das", "Khan", "Patel", "Nair", "Gupta"]
+FILLER = [
+    "The court observed that the evidence on record was sufficient to establish the charge.",
+    "It is settled law that the prosecution must prove its case beyond reasonable doubt.",
+    "The learned counsel submitted that the investigation was conducted in a biased manner.",
+    "The statement recorded before the magistrate was found to be voluntary.",
+    "The trial court failed to appreciate the contradictions in the testimony.",
+    "Bail was granted subject to the furnishing of a personal bond and two sureties.",
+    "The FIR was lodged after an unexplained delay of several days.",
+    "No material was placed on record to show the existence of a conspiracy."
+]
+
+
+def synthetic_chunk(rng: random.Random) -> str:
+    """One legal-style paragraph mentioning a section, an offence and a citation"""
+    act = rng.choice(ACTS)
+    section = f"{rng.randint(1, 511)}{rng.choice(['', '', '', 'A', 'B'])}"
+    sentences = [
+        f"Under Section {section} of the {act}, {rng.choice(PARTIES)} was charged with {rng.choice(OFFENCES)}.",
+        f"Reliance was placed on {rng.choice(NAMES)} v. {rng.choice(NAMES)}, AIR {rng.randint(1950, 2023)} "
+        f"{rng.choice(COURTS)} {rng.randint(1, 2500)}.",
+    ]
+    sentences.extend(rng.sample(FILLER, 3))
+    rng.shuffle(sentences)
+    return " ".join(sentences)
+
+
+def synthetic_corpus(num_docs: int, chunks_per_doc: int, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [[synthetic_chunk(rng) for _ in range(chunks_per_doc)] for _ in range(num_docs)]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
@@ -0,0 +1,323 @@
+"""
+Retrieval benchmark for FAISSVectorStore
+
+Generates synthetic legal-style corpora and measures, per session size:
+ingest throughput (embedding and index build), warm and cold query latency
+(cold: session evicted and its files dropped from the page cache), resident
+memory (RSS of a fresh process after opening and querying the index) and
+disk per chunk, and recall@k of the session index against exact search over
+the original (unquantized) chunk embeddings. Results are written as JSON so
+runs can be compared across changes.
+
+Usage (from backend/):
+    python -m benchmarks.retrieval_benchmark --docs 1,10,100,500 --output bench.json
+
+The default "hashing" embedding backend needs no model download, so numbers
+are reproducible on any machine; use --backend hf to include the real model
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+# Importing the vector store builds its global instance, with its catalog and caches;
+# keep those out of the real data directory (spawned probes inherit the setting)
+os.environ["FAISS_INDEX_DIR"] = os.path.join(tempfile.gettempdir(), "retrieval-benchmark-store")
+
+from app.services.embedding_backends import get_embedding_backend
+from app.services.faiss_store import FAISSVectorStore, SessionIndex, _normalized, DOC_ID_SHIFT
+from app.services.index_factory import index_type_of
+from benchmarks.common import synthetic_corpus, git_commit
+
+
+def synthetic_queries(corpus: List[List[str]], num_queries: int, seed: int) -> List[str]:
+    """Queries built from fragments of random chunks, as users quote sections and offences"""
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(num_queries):
+        chunk = rng.choice(rng.choice(corpus))
+        sentence = rng.choice(chunk.split(". "))
+        words = sentence.split()
+        start = rng.randint(0, max(len(words) - 6, 0))
+        queries.append(" ".join(words[start:start + 6]))
+    return queries
+
+
+class TimedBackend:
+    """Wraps an embedding backend and accumulates the time spent embedding"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.embed_seconds = 0.0
+        self.embedded = 0
+
+    @property
+    def cache_key(self) -> str:
+        return self.backend.cache_key
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        vectors = self.backend.embed_documents(texts)
+        self.embed_seconds += time.perf_counter() - start
+        self.embedded += len(texts)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.backend.embed_query(text)
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50": float(np.percentile(samples_ms, 50)),
+        "p95": float(np.percentile(samples_ms, 95)),
+        "p99": float(np.percentile(samples_ms, 99)),
+        "mean": float(np.mean(samples_ms))
+    }
+
+
+def directory_bytes(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process, None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def drain_compactions(store: FAISSVectorStore, session_id: str) -> float:
+    """Wait until no background compaction of the session is queued or running, returns the wait"""
+    start = time.perf_counter()
+    while store.compaction_in_progress(session_id):
+        time.sleep(0.01)
+    return time.perf_counter() - start
+
+
+def drop_page_cache(path: str) -> bool:
+    """Evict the files of an index directory from the OS page cache, False where that is unsupported"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for entry in os.scandir(path):
+        if entry.is_file():
+            fd = os.open(entry.path, os.O_RDONLY)
+            try:
+                # Dirty pages are not evicted, so write them back first
+                os.fsync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return True
+
+
+def resident_probe(index_path: str, query_vectors: np.ndarray, k: int) -> Dict:
+    """
+    RSS growth of this process from opening the session index, and from then
+    searching it with every query vector; mmapped pages count once touched.
+    Run in a fresh process, so nothing of the index is resident beforehand
+    """
+    gc.collect()
+    before = rss_bytes()
+    session_index = SessionIndex.open(index_path)
+    opened = rss_bytes()
+    for query_vector in query_vectors:
+        session_index._dense_search(query_vector, k)
+    searched = rss_bytes()
+    if before is None:
+        return {"after_open": None, "after_queries": None}
+    return {"after_open": opened - before, "after_queries": searched - before}
+
+
+def run_size(num_docs: int, args, backend) -> Dict:
+    """Benchmark one session holding num_docs documents"""
+    corpus = synthetic_corpus(num_docs, args.chunks_per_doc, args.seed)
+    queries = synthetic_queries(corpus, args.queries, args.seed)
+    total_chunks = num_docs * args.chunks_per_doc
+
+    work_dir = tempfile.mkdtemp(prefix="retrieval-bench-")
+    store = None
+    session_id = "bench"
+    try:
+        store = FAISSVectorStore(work_dir, index_type=args.index_type, retrieval_mode=args.mode)
+        timed = TimedBackend(backend)
+        store._embeddings = timed
+
+        # Ingest: one create_index call per document, as uploads arrive
+        start = time.perf_counter()
+        for doc_number, chunks in enumerate(corpus):
+            metadatas = [{"source": f"doc{doc_number}.pdf", "page": i // 3 + 1} for i in range(len(chunks))]
+            store.create_index(chunks, metadatas, session_id, f"doc-{doc_number}")
+        ingest_seconds = time.perf_counter() - start
+        segments_after_ingest = len(store.vector_stores.get(session_id).segments)
+
+        # Compactions scheduled by the uploads would otherwise overlap the forced one and the timings
+        compaction_wait_seconds = drain_compactions(store, session_id)
+        start = time.perf_counter()
+        compacted = store.compact(session_id, force=True)
+        compact_seconds = time.perf_counter() - start
+
+        session_index = store.vector_stores.get(session_id)
+        index_path = session_index.path
+
+        # Warm queries (index resident, query vectors not cached)
+        store.query(session_id, queries[0], args.k)
+        warm = []
+        for query in queries:
+            start = time.perf_counter()
+            store.query(session_id, query, args.k)
+            warm.append((time.perf_counter() - start) * 1000)
+
+        # Cold loads: evicted from the store and its files dropped from the page cache first
+        open_ms, cold = [], []
+        page_cache_dropped = True
+        for query in queries[:args.cold_samples]:
+            store.vector_stores.pop(session_id)
+            gc.collect()
+            page_cache_dropped &= drop_page_cache(index_path)
+            start = time.perf_counter()
+            SessionIndex.open(index_path)
+            open_ms.append((time.perf_counter() - start) * 1000)
+
+            store.vector_stores.pop(session_id)
+            gc.collect()
+            drop_page_cache(index_path)
+            start = time.perf_counter()
+            store.query(session_id, query, args.k)
+            cold.append((time.perf_counter() - start) * 1000)
+
+        # Recall of the session index (all segments, any index type) against exact search over
+        # the corpus embeddings themselves, not vectors decoded from a quantized index
+        documents = store.catalog.get_session(session_id)["documents"]
+        ids, vectors = [], []
+        for doc_number, chunks in enumerate(corpus):
+            base = documents[f"doc-{doc_number}"]["document_number"] << DOC_ID_SHIFT
+            ids.extend(base + i for i in range(len(chunks)))
+            vectors.append(_normalized(backend.embed_documents(chunks)))
+        vectors = np.vstack(vectors)
+        k = min(args.k, len(ids))
+        exact = faiss.IndexFlatIP(vectors.shape[1])
+        exact.add(vectors)
+        session_index = store.vector_stores.get(session_id) or SessionIndex.open(index_path)
+        query_vectors = _normalized([store.embed_query(q) for q in queries])
+        _, truth = exact.search(query_vectors, k)
+        hits = 0
+        for query_vector, expected in zip(query_vectors, truth):
+            found = {vector_id for vector_id, _ in session_index._dense_search(query_vector, k)}
+            hits += len(found & {ids[i] for i in expected})
+
+        # A fresh process, so the RSS reflects this index alone once queries have touched it
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            resident = pool.submit(resident_probe, index_path, query_vectors, k).result()
+        per_chunk = resident["after_queries"] / total_chunks if resident["after_queries"] is not None else None
+
+        return {
+            "documents": num_docs,
+            "chunks": total_chunks,
+            "index_type": index_type_of(session_index.index),
+            "ingest": {
+                "seconds": ingest_seconds,
+                "chunks_per_second": total_chunks / ingest_seconds,
+                "embed_seconds": timed.embed_seconds,
+                "embed_chunks_per_second": timed.embedded / timed.embed_seconds if timed.embed_seconds else None,
+                "index_build_seconds": ingest_seconds - timed.embed_seconds,
+                "index_build_chunks_per_second": total_chunks / max(ingest_seconds - timed.embed_seconds, 1e-9),
+                "segments_after_ingest": segments_after_ingest,
+                "background_compaction_wait_seconds": compaction_wait_seconds,
+                "compacted": compacted,
+                "compact_seconds": compact_seconds
+            },
+            "query_latency_ms": {
+                "warm": percentiles(warm),
+                # Query on an evicted session: open, search and chunk lookup from disk
+                "cold_first_query": percentiles(cold),
+                "open_index": percentiles(open_ms),
+                "page_cache_dropped": page_cache_dropped
+            },
+            "memory": {
+                # RSS growth of a fresh process, see resident_probe
+                "rss_after_open_bytes": resident["after_open"],
+                "rss_after_queries_bytes": resident["after_queries"],
+                "rss_after_queries_bytes_per_chunk": per_chunk,
+                "estimated_bytes": session_index.memory_bytes(),
+                "disk_bytes": directory_bytes(index_path),
+                "disk_bytes_per_chunk": directory_bytes(index_path) / total_chunks
+            },
+            "recall_at_k": hits / (len(queries) * k),
+            "k": k
+        }
+    finally:
+        if store is not None:
+            # Nothing may still be writing into work_dir
+            drain_compactions(store, session_id)
+            store._compaction_executor.shutdown(wait=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISSVectorStore retrieval benchmark")
+    parser.add_argument("--docs", default="1,10,100,500", help="Comma-separated documents per session")
+    parser.add_argument("--chunks-per-doc", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cold-samples", type=int, default=10)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--backend", default="hashing", help="Embedding backend: hashing, hf or onnx")
+    parser.add_argument("--index-type", default="auto")
+    parser.add_argument("--mode", default="dense", help="Retrieval mode: dense or hybrid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    backend = get_embedding_backend(args.backend)
+    results = []
+    for num_docs in [int(n) for n in args.docs.split(",")]:
+        print(f"[BENCH] {num_docs} documents x {args.chunks_per_doc} chunks", flush=True)
+        results.append(run_size(num_docs, args, backend))
+
+    report = {
+        "benchmark": "retrieval",
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "faiss": faiss.__version__,
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            "backend": args.backend,
+            "embedding_cache_key": backend.cache_key,
+            "index_type": args.index_type,
+            "mode": args.mode,
+            "chunks_per_doc": args.chunks_per_doc,
+            "queries": args.queries,
+            "k": args.k,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[BENCH] Wrote {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# App modules build their global stores at import time: point them at a scratch
+# directory and the model-free embedding backend before any test imports them
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["FAISS_INDEX_DIR"] = os.path.join(TEST_DATA_DIR, "faiss_indexes")
+os.environ["EMBEDDING_BACKEND"] = "hashing"
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    from app.services.embedding_backends import HashingBackend
+    from app.services.faiss_store import FAISSVectorStore
+
+    store = FAISSVectorStore(str(tmp_path), index_type="flat", retrieval_mode="dense")
+    store._embeddings = HashingBackend(64)
+    yield store
+    store._compaction_executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    """A fresh app database (fir.db) for the test"""
+    from app.db import database
+
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "fir.db"))
+    database.init_db()
+    return database
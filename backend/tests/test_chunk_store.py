@@ -0,0 +1,57 @@
+from app.services.chunk_store import ChunkStore
+
+
+def test_chunks_round_trip_text_and_metadata(tmp_path):
+    chunks = ChunkStore(str(tmp_path / "chunks.db"))
+    doc = chunks.add_document("a")
+    chunks.add_chunks(
+        [1, 2],
+        doc,
+        ["first chunk", "second chunk"],
+        [
+            {"source": "a.pdf", "page": 1, "ocr": False},
+            {"source": "a.pdf", "page": 2, "ocr": True, "type": "judgment", "text": "dropped"}
+        ]
+    )
+
+    assert chunks.get([2, 1, 99]) == {
+        1: {"text": "first chunk", "metadata": {"source": "a.pdf", "page": 1}},
+        2: {"text": "second chunk", "metadata": {"source": "a.pdf", "page": 2, "ocr": True, "type": "judgment"}}
+    }
+    assert chunks.get([]) == {}
+    assert chunks.chunk_count(doc) == 2
+
+
+def test_removed_document_is_tombstoned_and_its_number_not_reused(tmp_path):
+    chunks = ChunkStore(str(tmp_path / "chunks.db"))
+    a = chunks.add_document("a")
+    chunks.add_chunks([10, 11, 12], a, ["x", "y", "z"], [{}, {}, {}])
+    (parent,) = chunks.add_parents(a, ["page one"])
+    assert chunks.get_parents([parent]) == {parent: "page one"}
+
+    chunks.remove_document("a")
+    chunks.remove_document("unknown")
+
+    assert chunks.document_numbers() == {}
+    assert chunks.tombstones() == {a: 3}
+    assert chunks.get([10, 11, 12]) == {}
+    assert chunks.get_parents([parent]) == {}
+    assert chunks.add_document("b") > a
+
+
+def test_compaction_manifest(tmp_path):
+    chunks = ChunkStore(str(tmp_path / "chunks.db"))
+    assert chunks.base_file() is None
+    chunks.add_segment(1, "segment_1.faiss")
+    chunks.add_segment(2, "segment_2.faiss")
+    doc = chunks.add_document("a")
+    chunks.remove_document("a")
+
+    chunks.commit_compaction("base_2.faiss", [1], [doc])
+
+    assert chunks.base_file() == "base_2.faiss"
+    assert chunks.segments() == {2: "segment_2.faiss"}
+    assert chunks.tombstones() == {}
+    # Segment numbers keep counting after compaction
+    assert chunks.last_segment_number() == 2
+    assert ChunkStore(str(tmp_path / "chunks.db")).segments() == {2: "segment_2.faiss"}
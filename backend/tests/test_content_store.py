@@ -0,0 +1,42 @@
+from app.services.content_store import ContentStore
+
+
+def record(content, sha256, chunks=("chunk one", "chunk two")):
+    recorder = content.recorder(sha256)
+    recorder.page("page text", {"page": 1})
+    recorder.batch(list(chunks), [{"page": 1} for _ in chunks], [])
+    recorder.commit("pdf", "flat")
+
+
+def test_purge_keeps_referenced_and_recent_content(tmp_path):
+    content = ContentStore(str(tmp_path / "content.db"))
+    record(content, "kept")
+    record(content, "orphan")
+
+    # Unreferenced but used within the retention period
+    assert content.purge({"kept"}, retention_seconds=3600) == 0
+    assert content.get("orphan") is not None
+
+    assert content.purge({"kept"}, retention_seconds=0) == 1
+    assert content.get("orphan") is None
+    assert content.chunks("orphan") == ([], [], [])
+    assert content.pages("orphan") == []
+    assert content.chunks("kept")[0] == ["chunk one", "chunk two"]
+
+
+def test_purge_drops_partial_content_but_not_a_recording_in_progress(tmp_path):
+    content = ContentStore(str(tmp_path / "content.db"))
+
+    # An ingestion that died without commit() or abort()
+    dead = content.recorder("dead")
+    dead.batch(["lost chunk"], [{}], [])
+    content._release("dead")
+
+    running = content.recorder("running")
+    running.batch(["new chunk"], [{}], [])
+
+    assert content.purge(set(), retention_seconds=0) == 1
+    assert content.chunks("dead")[0] == []
+
+    running.commit("pdf", "flat")
+    assert content.chunks("running")[0] == ["new chunk"]
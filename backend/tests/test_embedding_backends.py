@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from app.services.embedding_backends import HashingBackend, get_embedding_backend
+
+
+def test_hashing_vectors_are_deterministic_and_normalized():
+    texts = ["Cheating under Section 420 IPC", "Bail was granted", ""]
+    vectors = HashingBackend(64).embed_documents(texts)
+
+    assert vectors.shape == (3, 64) and vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors, HashingBackend(64).embed_documents(texts))
+    np.testing.assert_allclose(np.linalg.norm(vectors[:2], axis=1), 1.0, rtol=1e-6)
+    assert not vectors[2].any()
+
+
+def test_hashing_similarity_follows_lexical_overlap():
+    backend = HashingBackend(256)
+    query = np.asarray(backend.embed_query("cheating under section 420"))
+    close, far = backend.embed_documents(["the accused was charged with cheating under section 420",
+                                          "bail granted subject to two sureties"])
+
+    assert query @ close > query @ far
+    assert backend.embed_documents(["Cheating   UNDER section 420"])[0] @ query == pytest.approx(1.0)
+
+
+def test_backend_factory():
+    backend = get_embedding_backend("hashing")
+    assert isinstance(backend, HashingBackend)
+    # The dimension is part of the cache key, so vectors of different sizes never mix
+    assert HashingBackend(64).cache_key != HashingBackend(128).cache_key
+
+    with pytest.raises(ValueError):
+        get_embedding_backend("unknown")
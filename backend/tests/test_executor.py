@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executor import InstrumentedExecutor
+
+
+def test_run_executes_off_the_event_loop_thread():
+    executor = InstrumentedExecutor("test", 1)
+
+    async def main():
+        return threading.current_thread(), await executor.run(threading.current_thread)
+
+    loop_thread, worker_thread = asyncio.run(main())
+    assert worker_thread is not loop_thread
+    assert worker_thread.name.startswith("test")
+
+
+def test_counts_completed_and_failed_tasks():
+    executor = InstrumentedExecutor("test", 1)
+    assert executor.call(sum, [1, 2], start=3) == 6
+    with pytest.raises(ZeroDivisionError):
+        executor.call(lambda: 1 / 0)
+
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["queued"], stats["running"]) == (2, 1, 0, 0)
+
+
+def test_tracks_queue_depth_behind_a_busy_worker():
+    executor = InstrumentedExecutor("test", 1)
+    release = threading.Event()
+    blocked = executor._executor.submit(executor._instrumented(release.wait, (5,), {}))
+    queued = [executor._executor.submit(executor._instrumented(lambda: None, (), {})) for _ in range(3)]
+
+    assert executor.stats()["queued"] >= 3
+    release.set()
+    blocked.result()
+    for future in queued:
+        future.result()
+
+    stats = executor.stats()
+    assert stats["max_queue_depth"] >= 3
+    assert stats["queued"] == 0 and stats["completed"] == 4
+
+
+def test_store_queries_run_on_the_query_pool(store):
+    store.create_index(["cheating under section 420"], [{"source": "a.pdf"}], "s1", "a")
+
+    results = asyncio.run(store.aquery("s1", "cheating", top_k=1))
+
+    assert [r["text"] for r in results] == ["cheating under section 420"]
+    assert store.query_executor.stats()["completed"] == 1
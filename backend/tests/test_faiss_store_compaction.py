@@ -0,0 +1,130 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.faiss_store import SessionIndex, INDEX_FILE
+
+
+def add(store, session_id, document_id, texts):
+    store.create_index(texts, [{"source": f"{document_id}.pdf"} for _ in texts], session_id, document_id)
+
+
+def drain(store):
+    """Wait for background compactions scheduled so far"""
+    store._compaction_executor.submit(lambda: None).result()
+
+
+def faiss_files(store, session_id):
+    return sorted(f for f in os.listdir(os.path.join(store.persist_directory, session_id)) if f.endswith(".faiss"))
+
+
+def test_compaction_folds_segments_and_tombstones(store):
+    add(store, "s1", "a", ["cheating under section 420", "criminal breach of trust"])
+    add(store, "s1", "b", ["dowry death under section 304B", "cruelty by husband"])
+    add(store, "s1", "c", ["anticipatory bail application", "bail granted with sureties"])
+    store.delete_index("s1", "b")
+    drain(store)
+    store.compact("s1", force=True)
+
+    session_index = store.vector_stores.get("s1")
+    assert not session_index.segments and not session_index.tombstones
+    assert session_index.ntotal == 4
+    assert len(faiss_files(store, "s1")) == 1
+
+    texts = [r["text"] for r in store.query("s1", "dowry death cruelty", top_k=4)]
+    assert "dowry death under section 304B" not in texts
+    assert set(texts) == {"cheating under section 420", "criminal breach of trust",
+                          "anticipatory bail application", "bail granted with sureties"}
+
+
+def test_compaction_of_deleted_and_recreated_session_is_discarded(store, monkeypatch):
+    add(store, "s1", "old-a", ["old document one", "old document two"])
+    add(store, "s1", "old-b", ["old document three"])
+
+    started, release = threading.Event(), threading.Event()
+    build_compacted = SessionIndex.build_compacted
+
+    def slow_build(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return build_compacted(*args, **kwargs)
+
+    monkeypatch.setattr(SessionIndex, "build_compacted", slow_build)
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("compacted", store.compact("s1", force=True)))
+    worker.start()
+    assert started.wait(5)
+
+    # The session goes away and comes back under the same id while the merge is built
+    store.delete_index("s1")
+    add(store, "s1", "new", ["freshly uploaded judgment"])
+    release.set()
+    worker.join(5)
+
+    assert result["compacted"] is False
+    assert faiss_files(store, "s1") == [INDEX_FILE]
+    session_index = store.vector_stores.get("s1")
+    assert session_index.chunk_store.base_file() in (None, INDEX_FILE)
+    assert set(session_index.document_numbers) == {"new"}
+
+    results = store.query("s1", "freshly uploaded judgment", top_k=3)
+    assert [r["text"] for r in results] == ["freshly uploaded judgment"]
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_compaction_rebuilds_from_exact_vectors_not_quantized_codes(store):
+    texts = {document_id: [f"{document_id} paragraph {i} on section {i * 7} of the IPC" for i in range(40)]
+             for document_id in ("a", "b", "c")}
+    store.index_type = "sq8"
+    for document_id, chunk_texts in texts.items():
+        add(store, "s1", document_id, chunk_texts)
+    drain(store)
+    store.compact("s1", force=True)
+    assert store.vector_stores.get("s1").index.sa_code_size() == 64  # SQ8: one byte per dimension
+
+    # Dropping back to flat after a deletion must restore the exact embeddings
+    store.index_type = "flat"
+    store.delete_index("s1", "b")
+    drain(store)
+    store.compact("s1", force=True)
+
+    session_index = store.vector_stores.get("s1")
+    ids, vectors = session_index.live_vectors()
+    chunks = session_index.chunk_store.get(ids.tolist())
+    expected = store.embeddings.embed_documents([chunks[int(i)]["text"] for i in ids])
+    assert np.allclose(vectors, expected, atol=1e-6)
+
+
+def test_streamed_document_is_compacted_once_after_its_last_batch(store, monkeypatch):
+    from app.services import faiss_store as faiss_store_module
+    from app.services.ingestion_pipeline import IngestionPipeline
+
+    monkeypatch.setattr(faiss_store_module, "FAISS_MAX_SEGMENTS", 2)
+    pipeline = IngestionPipeline(processor=None, store=store, batch_size=4)
+    batches = [
+        ([f"page {b} chunk {i} under section {b * 10 + i}" for i in range(4)], [{"page": b}] * 4, [])
+        for b in range(6)
+    ]
+    counts = pipeline.ingest_batches(batches, "s1", "doc")
+    drain(store)
+
+    assert counts["batches"] == 6
+    assert store.compactions == 1
+    session_index = store.vector_stores.get("s1")
+    assert not session_index.segments and session_index.ntotal == 24
+
+
+def test_first_document_is_indexed_flat_and_retyped_in_the_background(store, monkeypatch):
+    from app.services import index_factory
+
+    monkeypatch.setattr(index_factory, "AUTO_FLAT_MAX_VECTORS", 50)
+    store.index_type = "auto"
+    add(store, "s1", "a", [f"paragraph {i} on section {i} of the IPC" for i in range(100)])
+    drain(store)
+
+    session_index = store.vector_stores.get("s1")
+    assert index_factory.index_type_of(session_index.index) == "sq8"
+    assert store.compactions == 1
+    assert not session_index.needs_compaction(store.index_type)
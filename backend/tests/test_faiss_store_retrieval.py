@@ -0,0 +1,78 @@
+from app.services.faiss_store import SessionIndex, RRF_K
+
+
+def add(store, session_id, document_id, texts):
+    store.create_index(texts, [{"source": f"{document_id}.pdf"} for _ in texts], session_id, document_id)
+
+
+def texts(results):
+    return [r["text"] for r in results]
+
+
+def test_document_filter(store):
+    add(store, "s1", "a", ["cheating under section 420", "criminal breach of trust"])
+    add(store, "s1", "b", ["dowry death under section 304B", "cruelty by husband"])
+
+    sources = {r["metadata"]["source"] for r in store.query("s1", "section", top_k=4, document_ids=["b"])}
+    assert sources == {"b.pdf"}
+    assert store.query("s1", "section", top_k=4, document_ids=["unknown"]) == []
+
+    # An empty list means no restriction, like None
+    everything = store.query("s1", "section", top_k=4)
+    assert store.query("s1", "section", top_k=4, document_ids=[]) == everything
+    assert len(everything) == 4
+
+
+def test_reciprocal_rank_fusion():
+    fused = SessionIndex._fuse([[1, 2, 3], [3, 1]])
+
+    assert [vector_id for vector_id, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == 1.0 / (RRF_K + 1) + 1.0 / (RRF_K + 2)
+    assert fused[2][1] == 1.0 / (RRF_K + 2)
+
+
+def test_hybrid_mode_promotes_exact_token_matches(store):
+    judgment = "Conviction under 498A upheld."
+    add(store, "s1", "a", [
+        "The court observed that the evidence on record was sufficient to establish the charge of cruelty.",
+        "The court observed that the evidence of the witness was consistent on cruelty by the husband.",
+        "The court observed the evidence and found the delay in lodging the FIR unexplained.",
+        "The evidence on record shows the court observed cruelty and harassment for dowry.",
+        "Bail was granted as the court observed the evidence was weak.",
+        judgment
+    ])
+    query = "court observed evidence of cruelty 498A"
+
+    session_index = store.vector_stores.get("s1")
+    best_lexical, _ = session_index.lexical_index.search(query, 1)[0]
+    assert session_index.chunk_store.get([best_lexical])[best_lexical]["text"] == judgment
+
+    dense = texts(store.query("s1", query, top_k=6, mode="dense"))
+    hybrid = texts(store.query("s1", query, top_k=6, mode="hybrid"))
+    assert hybrid.index(judgment) < dense.index(judgment)
+    assert sorted(hybrid) == sorted(dense)
+
+
+def test_chunks_citing_the_queried_section_rank_first(store):
+    add(store, "s1", "a", [
+        "Cheating and dishonestly inducing delivery of property is a serious offence.",
+        "The accused was charged with cheating the complainant of money."
+    ])
+    add(store, "s1", "b", [
+        "Bail was refused in the case registered under IPC 420.",
+        "The trial court recorded the statement of the witness."
+    ])
+
+    results = store.query("s1", "What does Section 420 say about cheating?", top_k=3)
+    assert results[0]["text"] == "Bail was refused in the case registered under IPC 420."
+    # Citation matches keep their cosine similarity, even when it is below the other hits
+    assert results[0]["score"] < results[1]["score"]
+
+    # The lookup honours the document restriction
+    restricted = store.query("s1", "What does Section 420 say about cheating?", top_k=3, document_ids=["a"])
+    assert "Bail was refused in the case registered under IPC 420." not in texts(restricted)
+
+    # Without a citation in the query the ranking is plain similarity
+    assert "Bail was refused in the case registered under IPC 420." not in texts(
+        store.query("s1", "what is cheating", top_k=3)
+    )
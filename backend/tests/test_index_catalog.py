@@ -0,0 +1,81 @@
+import os
+
+from app.services.embedding_backends import HashingBackend
+from app.services.faiss_store import FAISSVectorStore, CATALOG_FILE
+from app.services.index_catalog import IndexCatalog
+
+
+def open_store(path):
+    store = FAISSVectorStore(str(path), index_type="flat", retrieval_mode="dense")
+    store._embeddings = HashingBackend(64)
+    return store
+
+
+def test_catalog_records_sessions_documents_and_files(tmp_path):
+    index_path = tmp_path / "s1"
+    index_path.mkdir()
+    (index_path / "index.faiss").write_bytes(b"x" * 10)
+
+    catalog = IndexCatalog(str(tmp_path / "catalog.db"))
+    assert catalog.created
+    catalog.register_document("s1", str(index_path), "a", 1, 3)
+    catalog.register_document("s1", str(index_path), "b", 2, 5)
+
+    entry = catalog.get_session("s1")
+    assert entry["index_path"] == str(index_path)
+    assert {d: info["chunk_count"] for d, info in entry["documents"].items()} == {"a": 3, "b": 5}
+    assert entry["files"]["index.faiss"]["size_bytes"] == 10
+
+    catalog.remove_document("s1", "a")
+    assert list(IndexCatalog(str(tmp_path / "catalog.db")).get_session("s1")["documents"]) == ["b"]
+    assert not IndexCatalog(str(tmp_path / "catalog.db")).created
+
+    catalog.remove_session("s1")
+    assert catalog.get_session("s1") is None
+    assert catalog.list_sessions() == []
+
+
+def test_store_keeps_the_catalog_in_step_with_its_indexes(store):
+    store.create_index(["cheating under section 420"], [{"source": "a.pdf"}], "s1", "a")
+    store.create_index(["dowry death", "cruelty"], [{"source": "b.pdf"}] * 2, "s1", "b")
+
+    entry = store.catalog.get_session("s1")
+    assert {d: info["chunk_count"] for d, info in entry["documents"].items()} == {"a": 1, "b": 2}
+    assert set(entry["files"]) == set(os.listdir(entry["index_path"]))
+
+    store.delete_index("s1", "a")
+    assert list(store.catalog.get_session("s1")["documents"]) == ["b"]
+    store.delete_index("s1")
+    assert store.catalog.list_sessions() == []
+
+
+def test_queries_resolve_through_the_catalog_after_a_restart(tmp_path):
+    store = open_store(tmp_path)
+    store.create_index(["cheating under section 420"], [{"source": "a.pdf"}], "s1", "a")
+    store._compaction_executor.shutdown(wait=True)
+
+    restarted = open_store(tmp_path)
+    try:
+        assert restarted.query("unknown", "cheating") == []
+        assert restarted.query("s1", "cheating", document_ids=["other"]) == []
+        assert restarted.vector_stores.keys() == []
+
+        assert [r["text"] for r in restarted.query("s1", "cheating", top_k=1)] == ["cheating under section 420"]
+        assert restarted.vector_stores.keys() == ["s1"]
+    finally:
+        restarted._compaction_executor.shutdown(wait=True)
+
+
+def test_missing_catalog_is_rebuilt_from_the_index_directory(tmp_path):
+    store = open_store(tmp_path)
+    store.create_index(["cheating under section 420"], [{"source": "a.pdf"}], "s1", "a")
+    store._compaction_executor.shutdown(wait=True)
+    os.remove(tmp_path / CATALOG_FILE)
+
+    rebuilt = open_store(tmp_path)
+    try:
+        entry = rebuilt.catalog.get_session("s1")
+        assert entry["index_path"] == str(tmp_path / "s1")
+        assert entry["documents"]["a"]["chunk_count"] == 1
+    finally:
+        rebuilt._compaction_executor.shutdown(wait=True)
@@ -0,0 +1,80 @@
+from app.services import index_residency
+from app.services.embedding_backends import HashingBackend
+from app.services.faiss_store import FAISSVectorStore
+from app.services.index_residency import IndexResidencyManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    manager = IndexResidencyManager(max_bytes=100)
+    manager.put("a", "A", 40)
+    manager.put("b", "B", 40)
+    assert manager.get("a") == "A"  # b is now the least recently used
+
+    manager.put("c", "C", 40)
+    assert manager.keys() == ["a", "c"]
+    assert manager.get("b") is None
+
+    stats = manager.stats()
+    assert stats["resident_bytes"] == 80
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_entry_larger_than_the_budget_stays_resident_alone():
+    manager = IndexResidencyManager(max_bytes=100)
+    manager.put("a", "A", 40)
+    manager.put("big", "BIG", 500)
+
+    assert manager.keys() == ["big"]
+    assert manager.get("big") == "BIG"
+
+
+def test_resizing_an_entry_updates_the_resident_bytes():
+    manager = IndexResidencyManager(max_bytes=100)
+    manager.put("a", "A", 40)
+    manager.put("a", "A2", 70)
+    assert manager.stats()["resident_bytes"] == 70
+
+    assert manager.pop("a") == "A2"
+    assert manager.pop("a", "gone") == "gone"
+    assert manager.stats()["resident_bytes"] == 0
+
+
+def test_idle_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(index_residency.time, "monotonic", clock)
+    manager = IndexResidencyManager(max_bytes=100, ttl_seconds=60)
+    manager.put("a", "A", 10)
+    manager.put("b", "B", 10)
+
+    clock.now += 45
+    assert manager.get("a") == "A"  # refreshes a only
+    clock.now += 30
+
+    assert "a" in manager
+    assert manager.get("b") is None
+    assert manager.stats()["expirations"] == 1
+
+
+def test_evicted_session_indexes_reload_from_disk(tmp_path):
+    store = FAISSVectorStore(str(tmp_path), memory_budget_bytes=1, index_type="flat", retrieval_mode="dense")
+    store._embeddings = HashingBackend(64)
+    try:
+        store.create_index(["cheating under section 420"], [{"source": "a.pdf"}], "s1", "a")
+        store.create_index(["dowry death under section 304B"], [{"source": "b.pdf"}], "s2", "b")
+        assert store.vector_stores.keys() == ["s2"]
+
+        results = store.query("s1", "cheating", top_k=1)
+        assert [r["text"] for r in results] == ["cheating under section 420"]
+        assert store.vector_stores.keys() == ["s1"]
+        assert store.residency_stats()["evictions"] == 2
+    finally:
+        store._compaction_executor.shutdown(wait=True)
@@ -0,0 +1,185 @@
+import json
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.content_store import content_store
+from app.services.faiss_store import faiss_store
+from app.services.ingestion_jobs import ingestion_jobs, TERMINAL_STATUSES
+from app.services.ingestion_pipeline import ingestion_pipeline
+from app.services.speech_to_text import speech_to_text_service
+
+PAGES = [
+    "The accused was charged with cheating under Section 420 IPC for selling land he did not own.",
+    "Bail was granted subject to two sureties and a personal bond."
+]
+
+
+@pytest.fixture
+def session_id(app_db):
+    session_id = str(uuid.uuid4())
+    with app_db.get_db() as conn:
+        conn.execute("INSERT INTO chat_sessions (session_id, user_id) VALUES (?, 1)", (session_id,))
+        conn.commit()
+    yield session_id
+    faiss_store.delete_index(session_id)
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"upload")
+    return str(path)
+
+
+@pytest.fixture
+def pdf_pages(monkeypatch):
+    """Pages the PDF extraction yields, instead of parsing the upload"""
+    pages = list(PAGES)
+
+    def iter_pdf_pages(pdf_path, source_name):
+        for number, text in enumerate(pages, 1):
+            yield text, {"source": source_name, "page": number}
+
+    monkeypatch.setattr(ingestion_pipeline.processor, "iter_pdf_pages", iter_pdf_pages)
+    return pages
+
+
+def wait(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = ingestion_jobs.get(job_id)
+        if job["status"] in TERMINAL_STATUSES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def listed_documents(app_db, session_id):
+    with app_db.get_db() as conn:
+        rows = conn.execute("SELECT document_id FROM session_documents WHERE session_id = ?", (session_id,)).fetchall()
+    return [r["document_id"] for r in rows]
+
+
+def test_pdf_is_listed_once_indexed(app_db, session_id, upload, pdf_pages):
+    sha256 = uuid.uuid4().hex
+    job = wait(ingestion_jobs.submit(session_id, "doc-1", upload, "case.pdf", "pdf", sha256))
+
+    assert job["status"] == "completed", job["error"]
+    assert job["result"]["pages"] == 2 and job["result"]["chunks_created"] == job["chunks_indexed"] > 0
+    assert "content_sha256" not in job
+    assert listed_documents(app_db, session_id) == ["doc-1"]
+    assert content_store.get(sha256)["chunking"] == ingestion_pipeline.chunking_key
+
+    results = faiss_store.query(session_id, "cheating", top_k=1, document_ids=["doc-1"])
+    assert results[0]["metadata"]["source"] == "case.pdf"
+
+
+def test_pdf_without_text_fails_and_is_not_listed(app_db, session_id, upload, pdf_pages):
+    pdf_pages[:] = ["", "   "]
+    sha256 = uuid.uuid4().hex
+    job = wait(ingestion_jobs.submit(session_id, "doc-1", upload, "scan.pdf", "pdf", sha256))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "No text could be extracted from the PDF"
+    assert listed_documents(app_db, session_id) == []
+    assert content_store.get(sha256) is None
+
+
+def test_stored_pages_are_rechunked_and_stored_again(app_db, session_id, upload, monkeypatch):
+    sha256 = uuid.uuid4().hex
+    recorder = content_store.recorder(sha256)
+    for number, text in enumerate(PAGES, 1):
+        recorder.page(text, {"page": number})
+    recorder.batch(["stale chunk"], [{"page": 1}], [])
+    recorder.commit("pdf", "stale-chunking")
+
+    def no_extraction(*args):
+        raise AssertionError("Stored content must not be extracted again")
+
+    monkeypatch.setattr(ingestion_pipeline.processor, "iter_pdf_pages", no_extraction)
+    job = wait(ingestion_jobs.submit(session_id, "doc-1", upload, "copy.pdf", "pdf", sha256))
+
+    assert job["status"] == "completed", job["error"]
+    assert content_store.get(sha256)["chunking"] == ingestion_pipeline.chunking_key
+    chunks, _, _ = content_store.chunks(sha256)
+    assert "stale chunk" not in chunks
+    assert len(chunks) == job["result"]["chunks_created"]
+
+
+def test_media_without_speech_fails_and_is_not_listed(app_db, session_id, upload, monkeypatch):
+    monkeypatch.setattr(
+        speech_to_text_service, "process_path",
+        lambda path, filename: {"text": "", "language": "en", "file_type": "audio"}
+    )
+    job = wait(ingestion_jobs.submit(session_id, "doc-1", upload, "silence.mp3", "media"))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "No speech could be transcribed from the file"
+    assert listed_documents(app_db, session_id) == []
+
+
+def test_document_of_a_deleted_session_is_not_indexed(app_db, upload, pdf_pages):
+    session_id = str(uuid.uuid4())
+    job = wait(ingestion_jobs.submit(session_id, "doc-1", upload, "case.pdf", "pdf"))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Session was deleted during ingestion"
+    assert faiss_store.catalog.get_session(session_id) is None
+
+
+@pytest.fixture
+def client(app_db, monkeypatch):
+    monkeypatch.setattr(routes, "JOB_EVENTS_POLL_SECONDS", 0.01)
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_job_events_stream_until_the_job_finishes(client, session_id, upload, pdf_pages, monkeypatch):
+    release = threading.Event()
+    iter_pdf_pages = ingestion_pipeline.processor.iter_pdf_pages
+
+    def held(pdf_path, source_name):
+        release.wait(5)
+        yield from iter_pdf_pages(pdf_path, source_name)
+
+    monkeypatch.setattr(ingestion_pipeline.processor, "iter_pdf_pages", held)
+    job_id = ingestion_jobs.submit(session_id, "doc-1", upload, "case.pdf", "pdf")
+
+    def release_when_running():
+        # The test client delivers the stream once it ends, so the job is let go from here
+        while ingestion_jobs.get(job_id)["status"] != "running":
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+
+    threading.Thread(target=release_when_running, daemon=True).start()
+    events = []
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for line in response.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+
+    assert events[0]["status"] in ("queued", "running")
+    assert events[-1]["status"] == "completed"
+    assert len(events) > 1
+    assert all(a != b for a, b in zip(events, events[1:]))
+
+
+def test_unknown_job_and_session(client):
+    assert client.get("/api/jobs/unknown").status_code == 404
+    assert client.get("/api/jobs/unknown/events").status_code == 404
+
+    response = client.post(
+        "/api/upload-audio-video",
+        params={"session_id": "unknown"},
+        files={"file": ("hearing.mp3", b"audio", "audio/mpeg")}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,47 @@
+from app.services.document_processor import document_processor
+
+PAGE_ONE = "The accused was charged with cheating. The complainant paid money for land that did not exist."
+PAGE_TWO = "Bail was granted subject to two sureties. The accused must appear before the court every month."
+
+
+def add_hierarchical(store, session_id, document_id, pages, child_size):
+    chunks, metas, parents = document_processor.hierarchical_chunking(
+        pages, [{"source": f"{document_id}.pdf", "page": n} for n in range(1, len(pages) + 1)], child_size=child_size
+    )
+    store.create_index(chunks, metas, session_id, document_id, parents)
+    return chunks
+
+
+def test_hierarchical_chunking_keeps_pages_as_parents():
+    chunks, metas, parents = document_processor.hierarchical_chunking(
+        [PAGE_ONE, "   ", PAGE_TWO], [{"page": 1}, {"page": 2}, {"page": 3}], child_size=50
+    )
+
+    assert parents == [PAGE_ONE, PAGE_TWO]
+    assert len(chunks) > len(parents)
+    assert {m["parent"] for m in metas} == {0, 1}
+    assert all(chunk in parents[meta["parent"]] for chunk, meta in zip(chunks, metas))
+
+
+def test_child_hits_expand_to_their_page_once(store):
+    chunks = add_hierarchical(store, "s1", "a", [PAGE_ONE, PAGE_TWO], child_size=50)
+
+    children = store.query("s1", "accused", top_k=len(chunks), expand_parents=False)
+    assert len(children) == len(chunks)
+    assert all("parent_id" in r["metadata"] for r in children)
+
+    pages = store.query("s1", "accused", top_k=len(chunks))
+    assert sorted(r["text"] for r in pages) == sorted([PAGE_ONE, PAGE_TWO])
+    assert sum(r["matched_chunks"] for r in pages) == len(chunks)
+
+
+def test_expanding_reranked_hits(store):
+    add_hierarchical(store, "s1", "a", [PAGE_ONE, PAGE_TWO], child_size=50)
+    store.create_index(["a flat chunk about sureties"], [{"source": "b.pdf"}], "s1", "b")
+
+    children = store.query("s1", "sureties", top_k=10, expand_parents=False)
+    expanded = store.expand_parents("s1", children)
+
+    assert "a flat chunk about sureties" in [r["text"] for r in expanded]
+    assert PAGE_TWO in [r["text"] for r in expanded]
+    assert len(expanded) == 3
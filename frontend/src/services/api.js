@@ -27,7 +27,9 @@ export const api = {
       throw new Error('Failed to upload document');
     }
 
-    return response.json();
+    // Indexing runs as a background job; resolve once the document is searchable
+    const upload = await response.json();
+    return api.waitForJob(upload.job_id);
   },
 
   uploadAudioVideo: async (file, sessionId) => {
@@ -43,9 +45,29 @@ export const api = {
       throw new Error('Failed to upload audio/video');
     }
 
+    const upload = await response.json();
+    return api.waitForJob(upload.job_id);
+  },
+
+  getJob: async (jobId) => {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch upload status');
+    }
+
     return response.json();
   },
 
+  waitForJob: async (jobId, intervalMs = 1000) => {
+    for (;;) {
+      const job = await api.getJob(jobId);
+      if (job.status === 'completed') return job;
+      if (job.status === 'failed') throw new Error(job.error || 'Upload processing failed');
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   sendMessage: async (sessionId, message, language = 'en', structuredOutput = false) => {
     const token = getSessionToken();
     const response = await fetch(`${API_BASE_URL}/chat`, {